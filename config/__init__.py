@@ -0,0 +1,7 @@
+# Carrega o Celery junto com o Django, se estiver instalado
+try:
+    from .celery import app as celery_app
+
+    __all__ = ["celery_app"]
+except ImportError:
+    pass
@@ -0,0 +1,20 @@
+"""
+Configuração do Celery do projeto.
+
+Os workers de coleta precisam do Chrome instalado e consomem a fila
+"scrape_queue" (ver CELERY_TASK_ROUTES em settings.py):
+
+    celery -A config worker -Q scrape_queue,celery
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+app = Celery("config")
+
+# Lê as configurações com prefixo CELERY_ do settings.py
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -3,19 +3,24 @@ Configurações do Django para o projeto Worten API.
 Documentação: https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Diretório base do projeto
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Chave secreta - em produção, usar variável de ambiente!
-SECRET_KEY = "django-insecure-rzm6!^^y+68r2v7_kfo4h#=6(k#x3f%al5eendyxn-+24deds^"
+# Chave secreta - em produção, definir DJANGO_SECRET_KEY no ambiente!
+SECRET_KEY = os.environ.get(
+    "DJANGO_SECRET_KEY",
+    "django-insecure-rzm6!^^y+68r2v7_kfo4h#=6(k#x3f%al5eendyxn-+24deds^",
+)
 
-# Modo debug - lembrar de desativar em produção
-DEBUG = True
+# Modo debug - desligado por padrão; DJANGO_DEBUG=1 pra desenvolvimento.
+# Com DEBUG ligado o Django guarda toda query executada em memória.
+DEBUG = os.environ.get("DJANGO_DEBUG", "0") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
 
 
 # Apps instalados
@@ -66,12 +71,29 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# SQLite por padrão; PostgreSQL quando POSTGRES_DB estiver definido
+if os.environ.get("POSTGRES_DB"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ["POSTGRES_DB"],
+            "USER": os.environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        }
     }
-}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
+
+# Conexões persistentes: evita reabrir a conexão a cada request/lote gravado
+DATABASES["default"]["CONN_MAX_AGE"] = 600
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
 
 
 # Validadores de senha
@@ -123,3 +145,21 @@ SWAGGER_SETTINGS = {
 DATA_DIR = BASE_DIR / "data"
 INPUT_SPREADSHEET = DATA_DIR / "input" / "worten.xlsx"
 OUTPUT_SPREADSHEET = DATA_DIR / "output" / "produtos_worten.xlsx"
+# Cópia interna sincronizada pela API (o XLSX só é gerado no download)
+INTERNAL_SPREADSHEET = DATA_DIR / "output" / "produtos_worten.parquet"
+
+# Coleta em background com Celery (opcional, ver config/celery.py)
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = os.environ.get(
+    "CELERY_RESULT_BACKEND", "redis://localhost:6379/1"
+)
+CELERY_TASK_ROUTES = {
+    "products.tasks.scrape_product": {"queue": "scrape_queue"},
+}
+
+# Headless costuma ser bloqueado pelo Cloudflare, então fica desligado por padrão
+SCRAPER_HEADLESS = os.environ.get("SCRAPER_HEADLESS", "0") == "1"
+
+# Buscas simultâneas no endpoint de coleta. Cada uma abre o seu Chrome e passa
+# pelo Cloudflare sozinha, então o padrão é 1 (aumentar é opcional)
+SCRAPE_MAX_WORKERS = max(1, int(os.environ.get("SCRAPE_MAX_WORKERS", "1")))
@@ -2,6 +2,7 @@
 Configuração de URLs do projeto Worten API.
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import permissions
@@ -29,15 +30,27 @@ API para gerenciamento de produtos coletados da Worten.pt.
     permission_classes=[permissions.AllowAny],
 )
 
+# Cache do schema gerado (o drf_yasg aplica cache_page internamente).
+# Em DEBUG fica desligado pra refletir mudanças na API na hora.
+SCHEMA_CACHE_TIMEOUT = 0 if settings.DEBUG else 60 * 60
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("products.urls")),
     # Documentação Swagger
     path(
         "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
+        schema_view.with_ui("swagger", cache_timeout=SCHEMA_CACHE_TIMEOUT),
         name="schema-swagger-ui",
     ),
-    path("swagger.json", schema_view.without_ui(cache_timeout=0), name="schema-json"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path(
+        "swagger.json",
+        schema_view.without_ui(cache_timeout=SCHEMA_CACHE_TIMEOUT),
+        name="schema-json",
+    ),
+    path(
+        "redoc/",
+        schema_view.with_ui("redoc", cache_timeout=SCHEMA_CACHE_TIMEOUT),
+        name="schema-redoc",
+    ),
 ]
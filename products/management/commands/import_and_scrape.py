@@ -2,11 +2,46 @@
 Comando para importar produtos e coletar dados da Worten.
 """
 
-import time
+import asyncio
+import random
+from django.db import reset_queries, transaction
 from django.utils import timezone
 from django.core.management.base import BaseCommand, CommandError
 from products.models import Product
-from products.services import WortenScraper, SpreadsheetService
+from products.services import (
+    IMPORT_BATCH_SIZE,
+    SpreadsheetService,
+    WortenScraper,
+    import_rows,
+)
+
+# Quantidade de produtos coletados entre cada gravação no banco
+SCRAPE_BATCH_SIZE = 50
+
+
+class AdaptiveDelay:
+    """
+    Delay entre requisições que se ajusta ao bloqueio do site.
+
+    Dobra a cada bloqueio (429/Cloudflare) e volta aos poucos para o
+    mínimo configurado conforme as buscas dão certo.
+    """
+
+    MAX_DELAY = 60.0
+
+    def __init__(self, floor: float):
+        self.floor = floor
+        self.current = floor
+
+    def next(self) -> float:
+        """Retorna o próximo delay com jitter de ±50%."""
+        return random.uniform(self.current * 0.5, self.current * 1.5)
+
+    def backoff(self):
+        self.current = min(max(self.current * 2, 1.0), self.MAX_DELAY)
+
+    def relax(self):
+        self.current = max(self.floor, self.current * 0.9)
 
 
 class Command(BaseCommand):
@@ -40,6 +75,142 @@ class Command(BaseCommand):
             action="store_true",
             help="Rodar sem interface (pode ser bloqueado pelo Cloudflare)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Buscas simultâneas, cada uma com seu navegador (padrão: 1)",
+        )
+        parser.add_argument(
+            "--celery",
+            action="store_true",
+            help="Enfileirar a coleta no Celery em vez de rodar aqui",
+        )
+
+    def _flush_scraped(self, pending, failed):
+        """Grava em lote os produtos coletados e esvazia as listas."""
+        # bulk_update não dispara o auto_now, então o updated_at vai junto
+        now = timezone.now()
+        for product in pending + failed:
+            product.updated_at = now
+
+        # Transação só em volta da gravação, nunca da coleta inteira
+        with transaction.atomic():
+            if pending:
+                Product.objects.bulk_update(
+                    pending, Product.SCRAPE_FIELDS + ["updated_at"], batch_size=500
+                )
+
+            # Nas exceções só o erro e a data mudam, o resto fica como estava
+            if failed:
+                Product.objects.bulk_update(
+                    failed,
+                    ["scrape_error", "last_scraped", "updated_at"],
+                    batch_size=500,
+                )
+
+        pending.clear()
+        failed.clear()
+
+        # Com DEBUG ligado o Django acumula as queries; limpa a cada lote
+        reset_queries()
+
+    async def _scrape_batch(
+        self, batch, scrapers, throttle, stats, total, pending, failed
+    ):
+        """
+        Coleta um lote de produtos em paralelo.
+
+        Cada busca pega um scraper livre do pool, tenta o caminho HTTP
+        assíncrono (Selenium roda numa thread como fallback) e devolve o
+        scraper após o delay.
+        Nenhum acesso ao banco acontece aqui: os produtos só são
+        preenchidos e enfileirados em pending/failed.
+        """
+        pool = asyncio.Queue()
+        for scraper in scrapers:
+            pool.put_nowait(scraper)
+
+        async def scrape_one(product):
+            scraper = await pool.get()
+            try:
+                result = await scraper.search_async(
+                    product.original_name, product.ean
+                )
+                return product, result, None
+            except Exception as e:
+                return product, None, e
+            finally:
+                await asyncio.sleep(throttle.next())
+                pool.put_nowait(scraper)
+
+        # Atalhos locais: o loop roda uma vez por produto
+        write = self.stdout.write
+        success = self.style.SUCCESS
+        warning = self.style.WARNING
+        error = self.style.ERROR
+
+        for future in asyncio.as_completed([scrape_one(p) for p in batch]):
+            product, result, exc = await future
+            stats["done"] += 1
+            write(f"[{stats['done']}/{total}] {product.display_name}...")
+
+            if exc is not None:
+                stats["errors"] += 1
+                product.scrape_error = str(exc)
+                product.last_scraped = timezone.now()
+                failed.append(product)
+                write(error(f"  -> Exceção: {exc}"))
+                continue
+
+            product.worten_name = result.name
+            product.worten_url = result.url
+            product.lowest_price = result.price
+            product.seller_name = result.seller
+            product.is_available = result.is_available
+            product.scrape_error = result.error
+            product.last_scraped = timezone.now()
+            pending.append(product)
+
+            if result.rate_limited:
+                throttle.backoff()
+            else:
+                throttle.relax()
+
+            if result.is_available:
+                stats["found"] += 1
+                price_str = f"{result.price}€" if result.price else "N/A"
+                write(success(f'  -> {price_str} ({result.seller or "Worten"})'))
+            elif result.error:
+                stats["errors"] += 1
+                write(warning(f"  -> {result.error}"))
+            else:
+                stats["not_found"] += 1
+                write(warning("  -> Não encontrado"))
+
+    def _dispatch_celery(self, limit):
+        """Enfileira uma tarefa por produto, com a planilha num chord."""
+        try:
+            from celery import chord
+            from products.tasks import scrape_product, export_spreadsheet
+        except ImportError:
+            raise CommandError("Celery não está instalado")
+
+        ids = Product.objects.values_list("id", flat=True)
+        if limit > 0:
+            ids = ids[:limit]
+        ids = list(ids)
+
+        if not ids:
+            self.stdout.write(self.style.WARNING("Nenhum produto para coletar."))
+            return
+
+        result = chord(scrape_product.s(pk) for pk in ids)(export_spreadsheet.si())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(ids)} produtos enfileirados na fila de coleta (chord {result.id})."
+            )
+        )
 
     def handle(self, *args, **options):
         import_only = options["import_only"]
@@ -47,6 +218,8 @@ class Command(BaseCommand):
         limit = options["limit"]
         delay = options["delay"]
         headless = options["headless"]
+        workers = max(1, options["workers"])
+        use_celery = options["celery"]
 
         spreadsheet_service = SpreadsheetService()
 
@@ -54,27 +227,15 @@ class Command(BaseCommand):
         if not scrape_only:
             self.stdout.write(self.style.NOTICE("Importando produtos da planilha..."))
             try:
-                df = spreadsheet_service.read_input_spreadsheet()
                 imported = 0
                 updated = 0
 
-                for _, row in df.iterrows():
-                    product_id = str(row.get("ID", ""))
-                    if not product_id:
-                        continue
-
-                    product, created = Product.objects.update_or_create(
-                        original_id=product_id,
-                        defaults={
-                            "ean": str(row.get("EAN", "")),
-                            "original_name": str(row.get("Name", "")),
-                        },
-                    )
-
-                    if created:
-                        imported += 1
-                    else:
-                        updated += 1
+                for rows in spreadsheet_service.iter_input_rows(
+                    batch_size=IMPORT_BATCH_SIZE
+                ):
+                    created, changed = import_rows(rows)
+                    imported += created
+                    updated += changed
 
                 self.stdout.write(
                     self.style.SUCCESS(
@@ -87,6 +248,11 @@ class Command(BaseCommand):
             except Exception as e:
                 raise CommandError(f"Erro na importação: {e}")
 
+        # Coleta via Celery: uma tarefa por produto e a planilha no final
+        if not import_only and use_celery:
+            self._dispatch_celery(limit)
+            return
+
         # Coleta dados dos produtos
         if not import_only:
             self.stdout.write(self.style.NOTICE("Coletando dados da Worten.pt..."))
@@ -97,68 +263,55 @@ class Command(BaseCommand):
                     )
                 )
 
-            scraper = WortenScraper(headless=headless)
-            products = Product.objects.all()
+            # O WebDriver não é thread-safe: cada busca simultânea usa o seu
+            scrapers = [WortenScraper(headless=headless) for _ in range(workers)]
+            throttle = AdaptiveDelay(delay)
+            products = Product.objects.only(
+                "id", "original_id", "original_name", "ean"
+            )
 
             if limit > 0:
                 products = products[:limit]
 
             total = products.count()
-            found = 0
-            not_found = 0
-            errors = 0
+            stats = {"done": 0, "found": 0, "not_found": 0, "errors": 0}
 
-            try:
-                for i, product in enumerate(products, 1):
-                    self.stdout.write(f"[{i}/{total}] {product.original_name[:50]}...")
-
-                    try:
-                        result = scraper.search_product(
-                            query=product.original_name, ean=product.ean
-                        )
+            # Produtos coletados aguardando gravação em lote
+            pending = []
+            failed = []
 
-                        product.worten_name = result.name
-                        product.worten_url = result.url
-                        product.lowest_price = result.price
-                        product.seller_name = result.seller
-                        product.is_available = result.is_available
-                        product.scrape_error = result.error
-                        product.last_scraped = timezone.now()
-                        product.save()
-
-                        if result.is_available:
-                            found += 1
-                            price_str = f"{result.price}€" if result.price else "N/A"
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f'  -> {price_str} ({result.seller or "Worten"})'
-                                )
-                            )
-                        elif result.error:
-                            errors += 1
-                            self.stdout.write(
-                                self.style.WARNING(f"  -> {result.error}")
+            try:
+                batch = []
+                for product in products.iterator(chunk_size=500):
+                    batch.append(product)
+                    if len(batch) == SCRAPE_BATCH_SIZE:
+                        asyncio.run(
+                            self._scrape_batch(
+                                batch, scrapers, throttle, stats, total, pending, failed
                             )
-                        else:
-                            not_found += 1
-                            self.stdout.write(self.style.WARNING("  -> Não encontrado"))
-
-                    except Exception as e:
-                        errors += 1
-                        product.scrape_error = str(e)
-                        product.last_scraped = timezone.now()
-                        product.save()
-                        self.stdout.write(self.style.ERROR(f"  -> Exceção: {e}"))
+                        )
+                        self._flush_scraped(pending, failed)
+                        batch = []
 
-                    # Delay entre requisições
-                    if i < total:
-                        time.sleep(delay)
+                if batch:
+                    asyncio.run(
+                        self._scrape_batch(
+                            batch, scrapers, throttle, stats, total, pending, failed
+                        )
+                    )
 
             finally:
-                # Sempre fecha o browser
+                # Grava o que ficou pendente, mesmo se a coleta for interrompida
+                self._flush_scraped(pending, failed)
+
+                # Sempre fecha os browsers
                 self.stdout.write(self.style.NOTICE("Fechando navegador..."))
-                scraper.close()
+                for scraper in scrapers:
+                    scraper.close()
 
+            found = stats["found"]
+            not_found = stats["not_found"]
+            errors = stats["errors"]
             self.stdout.write(
                 self.style.SUCCESS(
                     f"\nColeta concluída: {found} encontrados, {not_found} não encontrados, {errors} erros"
@@ -169,6 +322,8 @@ class Command(BaseCommand):
         self.stdout.write(self.style.NOTICE("Salvando na planilha de saída..."))
         try:
             output_path = spreadsheet_service.save_from_queryset(Product.objects.all())
+            # A cópia interna da API também, senão ela fica atrás do banco
+            SpreadsheetService.internal().save_from_queryset(Product.objects.all())
             self.stdout.write(self.style.SUCCESS(f"Salvo em: {output_path}"))
         except Exception as e:
             raise CommandError(f"Erro ao salvar planilha: {e}")
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['ean'], name='product_ean_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', 'last_scraped'], name='product_available_scraped_idx'),
+        ),
+    ]
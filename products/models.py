@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.functional import cached_property
 
 
 class Product(models.Model):
@@ -48,10 +49,33 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Campos atualizados a cada coleta (usados nas gravações em lote)
+    SCRAPE_FIELDS = [
+        "worten_name",
+        "worten_url",
+        "lowest_price",
+        "seller_name",
+        "is_available",
+        "scrape_error",
+        "last_scraped",
+    ]
+
     class Meta:
         ordering = ["original_id"]
+        indexes = [
+            models.Index(fields=["ean"], name="product_ean_idx"),
+            models.Index(
+                fields=["is_available", "last_scraped"],
+                name="product_available_scraped_idx",
+            ),
+        ]
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
 
     def __str__(self):
-        return f"{self.original_id} - {self.original_name[:50]}"
+        return f"{self.original_id} - {self.display_name}"
+
+    @cached_property
+    def display_name(self):
+        """Nome original truncado pra exibição em logs e no terminal."""
+        return self.original_name[:50]
@@ -6,6 +6,23 @@ Transformam os objetos do banco em JSON e vice-versa.
 from rest_framework import serializers
 from .models import Product
 
+# Campos do serializer completo, montados uma vez no import do módulo
+PRODUCT_FIELDS = (
+    "id",
+    "original_id",
+    "ean",
+    "original_name",
+    "worten_name",
+    "worten_url",
+    "lowest_price",
+    "seller_name",
+    "is_available",
+    "last_scraped",
+    "scrape_error",
+    "created_at",
+    "updated_at",
+)
+
 
 class ProductSerializer(serializers.ModelSerializer):
     """
@@ -15,22 +32,8 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = [
-            "id",
-            "original_id",
-            "ean",
-            "original_name",
-            "worten_name",
-            "worten_url",
-            "lowest_price",
-            "seller_name",
-            "is_available",
-            "last_scraped",
-            "scrape_error",
-            "created_at",
-            "updated_at",
-        ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        fields = PRODUCT_FIELDS
+        read_only_fields = ("id", "created_at", "updated_at")
 
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -41,11 +44,11 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = [
+        fields = (
             "original_id",
             "ean",
             "original_name",
-        ]
+        )
 
     def validate_original_id(self, value):
         """Valida se o ID já existe no banco."""
@@ -63,7 +66,7 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = [
+        fields = (
             "original_id",
             "ean",
             "original_name",
@@ -73,27 +76,28 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
             "seller_name",
             "is_available",
             "scrape_error",
-        ]
+        )
         extra_kwargs = {field: {"required": False} for field in fields}
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(serializers.Serializer):
     """
     Serializer simplificado para listagem.
     Só os campos principais pra não pesar a resposta.
+
+    Declarado campo a campo (sem ModelSerializer) pra evitar a introspecção
+    do modelo a cada resposta da listagem.
     """
 
-    class Meta:
-        model = Product
-        fields = [
-            "id",
-            "original_id",
-            "original_name",
-            "worten_name",
-            "lowest_price",
-            "seller_name",
-            "is_available",
-        ]
+    id = serializers.IntegerField(read_only=True)
+    original_id = serializers.CharField(read_only=True)
+    original_name = serializers.CharField(read_only=True)
+    worten_name = serializers.CharField(read_only=True, allow_null=True)
+    lowest_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, allow_null=True
+    )
+    seller_name = serializers.CharField(read_only=True, allow_null=True)
+    is_available = serializers.BooleanField(read_only=True)
 
 
 class ProductScrapeSerializer(serializers.Serializer):
@@ -1,4 +1,5 @@
 from .scraper import WortenScraper
 from .spreadsheet import SpreadsheetService
+from .importer import import_rows, IMPORT_BATCH_SIZE
 
-__all__ = ['WortenScraper', 'SpreadsheetService']
+__all__ = ['WortenScraper', 'SpreadsheetService', 'import_rows', 'IMPORT_BATCH_SIZE']
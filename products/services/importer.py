@@ -0,0 +1,50 @@
+"""
+Serviço de importação - grava no banco os produtos lidos da planilha.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+
+from products.models import Product
+
+# Quantidade de linhas por INSERT/UPDATE em lote
+IMPORT_BATCH_SIZE = 1000
+
+
+def import_rows(rows: Iterable[Dict[str, str]]) -> Tuple[int, int]:
+    """
+    Cria ou atualiza os produtos em lote.
+
+    Usa um único bulk_create com update_conflicts (INSERT ... ON CONFLICT
+    DO UPDATE no SQLite e no PostgreSQL) em vez de um update_or_create
+    por linha. Linhas sem ID são ignoradas. Retorna a tupla
+    (novos, atualizados).
+    """
+    # Última ocorrência de cada ID prevalece, como no update_or_create
+    by_id = {row["ID"]: row for row in rows if row["ID"]}
+
+    with transaction.atomic():
+        # Só pra contagem de novos/atualizados
+        existing = set(
+            Product.objects.filter(original_id__in=list(by_id)).values_list(
+                "original_id", flat=True
+            )
+        )
+
+        Product.objects.bulk_create(
+            [
+                Product(
+                    original_id=product_id,
+                    ean=row["EAN"],
+                    original_name=row["Name"],
+                )
+                for product_id, row in by_id.items()
+            ],
+            batch_size=IMPORT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["original_id"],
+            update_fields=["ean", "original_name", "updated_at"],
+        )
+
+    return len(by_id) - len(existing), len(existing)
@@ -8,20 +8,90 @@ Em produção, o ideal seria usar uma API oficial ou serviços de proxy rotativo
 """
 
 import re
-import json
+import atexit
+import asyncio
 import logging
 import time
+import shutil
+import hashlib
+import functools
+import threading
 import subprocess
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from urllib.parse import quote_plus
 
+import lxml.html
+from lxml.cssselect import CSSSelector
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson é bem mais rápido no JSON do Next.js; cai pro json padrão se faltar
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 logger = logging.getLogger(__name__)
 
+# Regexes compiladas uma vez no carregamento do módulo
+_CHROME_VER_RE = re.compile(r"(\d+)\.")
+_PRICE_STRIP_RE = re.compile(r"[€EUR\s]")
+_PRICE_NUM_RE = re.compile(r"(\d+\.?\d*)")
+
+# Palavras ignoradas no nome simplificado usado como segundo termo de busca
+_SKIP_WORDS = frozenset(
+    {
+        "de",
+        "da",
+        "do",
+        "das",
+        "dos",
+        "e",
+        "ou",
+        "com",
+        "para",
+        "em",
+        "um",
+        "uma",
+        "unidades",
+        "peças",
+    }
+)
+
+# Sessão HTTP única do módulo, com pool de conexões keep-alive.
+# Os headers vão em cada requisição, então instâncias diferentes não interferem.
+_SHARED_SESSION = requests.Session()
+_SHARED_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=["GET"],
+            # Esgotadas as tentativas, devolve a resposta (429 vira rate_limited)
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# Cache LRU do parse do __NEXT_DATA__: hash do JSON -> campos do ScrapedProduct.
+# Buscas repetidas (mesmo título vindo de EANs diferentes) não reparseiam o JSON.
+_NEXT_DATA_CACHE_SIZE = 256
+_NEXT_DATA_CACHE = OrderedDict()
+_NEXT_DATA_LOCK = threading.Lock()
+
+# Parser HTML reaproveitado entre as chamadas (sem rede e sem índice de IDs)
+_HTML_PARSER = lxml.html.HTMLParser(collect_ids=False, no_network=True)
+
 # Tenta importar componentes do Selenium
 SELENIUM_AVAILABLE = False
 UNDETECTED_AVAILABLE = False
@@ -41,7 +111,11 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import WebDriverException
+    from selenium.common.exceptions import (
+        StaleElementReferenceException,
+        TimeoutException,
+        WebDriverException,
+    )
 
     SELENIUM_AVAILABLE = True
 except ImportError:
@@ -55,8 +129,20 @@ except ImportError:
     pass
 
 
+# Scrapers vivos, fechados na saída do processo pra não deixar Chrome órfão.
+# WeakSet pra não segurar as instâncias (senão o __del__ nunca rodaria).
+_OPEN_SCRAPERS = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_scrapers():
+    for scraper in list(_OPEN_SCRAPERS):
+        scraper.close()
+
+
+@functools.lru_cache(maxsize=1)
 def get_chrome_version() -> Optional[int]:
-    """Detecta a versão do Chrome instalada."""
+    """Detecta a versão do Chrome instalada (calculada uma vez por processo)."""
     try:
         # Windows
         import winreg
@@ -69,13 +155,17 @@ def get_chrome_version() -> Optional[int]:
     except Exception:
         pass
 
+    # Evita o fork quando o binário nem existe no PATH
+    if not shutil.which("google-chrome"):
+        return None
+
     try:
         # Tenta via linha de comando
         result = subprocess.run(
             ["google-chrome", "--version"], capture_output=True, text=True
         )
         if result.returncode == 0:
-            match = re.search(r"(\d+)\.", result.stdout)
+            match = _CHROME_VER_RE.search(result.stdout)
             if match:
                 return int(match.group(1))
     except Exception:
@@ -84,6 +174,78 @@ def get_chrome_version() -> Optional[int]:
     return None
 
 
+def _parse_simple_price(text: str) -> Optional[Decimal]:
+    """
+    Parse de preço numa passada só, sem regex.
+
+    Só aceita dígitos com no máximo um separador decimal ("," ou "."),
+    além de "€" e espaços. Qualquer outra coisa retorna None e fica
+    pro parse completo com regex.
+    """
+    chars = []
+    has_sep = False
+    for ch in text:
+        if "0" <= ch <= "9":
+            chars.append(ch)
+        elif ch == "," or ch == ".":
+            if has_sep or not chars:
+                return None
+            has_sep = True
+            chars.append(".")
+        elif ch != "€" and not ch.isspace():
+            return None
+
+    if not chars:
+        return None
+
+    value = Decimal("".join(chars))
+    return value if value > 0 else None
+
+
+# Extrai todos os campos do card (arguments[0]) numa única chamada ao navegador.
+# Os seletores seguem a mesma ordem de prioridade da extração elemento a elemento.
+_EXTRACT_CARD_JS = """
+const card = arguments[0];
+const pick = (selectors, needText) => {
+    for (const sel of selectors) {
+        const el = card.querySelector(sel);
+        if (el && (!needText || el.innerText.trim())) return el;
+    }
+    return null;
+};
+const link = card.querySelector('a[href*="/produtos/"]');
+const name = pick(
+    ['.product-card__name-and-features', 'h3', 'h2', '[class*="name"]'], true
+);
+const price = pick(['.product-card__price', '[class*="price"]', '[class*="Price"]']);
+const seller = pick(['.product-card__seller', '[class*="seller"]']);
+return {
+    url: link ? link.href : null,
+    name: name ? name.innerText.trim() : null,
+    price: price ? price.innerText : null,
+    seller: seller ? seller.innerText : null,
+};
+"""
+
+# Só o texto do JSON do Next.js, em vez do DOM inteiro via page_source
+_NEXT_DATA_JS = (
+    "var e = document.getElementById('__NEXT_DATA__');"
+    " return e ? e.textContent : null;"
+)
+
+# Aviso de busca vazia, verificado dentro do navegador
+_NO_RESULTS_JS = (
+    "var t = document.body ? document.body.innerText.toLowerCase() : '';"
+    " return t.includes('sem resultados') || t.includes('nenhum resultado');"
+)
+
+
+def _cloudflare_cleared(driver) -> bool:
+    """Condição de espera: o título não é mais o da página de desafio."""
+    title = (driver.title or "").lower()
+    return "momento" not in title and "challenge" not in title
+
+
 @dataclass
 class ScrapedProduct:
     """Classe que representa os dados coletados de um produto."""
@@ -94,6 +256,8 @@ class ScrapedProduct:
     seller: Optional[str] = None
     is_available: bool = False
     error: Optional[str] = None
+    # Indica bloqueio do site (429/Cloudflare), usado pra aumentar o delay
+    rate_limited: bool = False
 
 
 class WortenScraper:
@@ -110,6 +274,65 @@ class WortenScraper:
     BASE_URL = "https://www.worten.pt"
     SEARCH_URL = f"{BASE_URL}/search"
 
+    # Erro da busca que terminou sem resultado (não é uma falha temporária)
+    NOT_FOUND_ERROR = "Produto não encontrado na Worten"
+
+    # Seletores de card de produto da busca, combinados num só
+    PRODUCT_CARD_SELECTOR = (
+        "article.product-card, .product-card, "
+        '[data-testid="product-card"], article[itemtype*="Product"]'
+    )
+
+    # Botão de aceitar cookies (OneTrust ou genérico), numa única espera
+    COOKIE_BUTTON_SELECTOR = '#onetrust-accept-btn-handler, button[id*="accept"]'
+
+    # Recursos que o navegador não precisa baixar pra extrair os dados
+    BLOCKED_URLS = [
+        "*.png",
+        "*.jpg",
+        "*.jpeg",
+        "*.gif",
+        "*.webp",
+        "*.woff",
+        "*.woff2",
+        "*.svg",
+        "*googletagmanager*",
+        "*google-analytics*",
+        "*doubleclick*",
+    ]
+
+    # Limite de leitura do corpo das respostas HTTP (2 MB)
+    MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+
+    # Seletores de nome e preço do card, em ordem de prioridade (a mesma do
+    # _EXTRACT_CARD_JS). Agrupados com vírgula, o primeiro elemento na ordem
+    # do documento ganharia, e não o seletor mais específico.
+    NAME_SELECTORS = (
+        ".product-card__name-and-features",
+        "h3",
+        "h2",
+        '[class*="name"]',
+    )
+    PRICE_SELECTORS = (".product-card__price", '[class*="price"]', '[class*="Price"]')
+    SELLER_SELECTORS = '.product-card__seller, [class*="seller"]'
+
+    # Cards no HTML puro, em ordem de prioridade ("article" é o último recurso)
+    HTML_CARD_SELECTORS = ('[data-testid="product-card"]', ".product-card", "article")
+
+    # Seletores do lxml compilados uma vez (o cssselect() traduz pra XPath
+    # em toda chamada). Mesmo tradutor "html" que o HtmlElement.cssselect usa.
+    _HTML_CARD_CSS = tuple(
+        CSSSelector(sel, translator="html") for sel in HTML_CARD_SELECTORS
+    )
+    _PRODUCT_LINK_CSS = CSSSelector('a[href*="/p/"]', translator="html")
+    _ANY_LINK_CSS = CSSSelector("a", translator="html")
+    _NAME_CSS = tuple(CSSSelector(sel, translator="html") for sel in NAME_SELECTORS)
+    # "span" fica como último recurso do preço
+    _PRICE_CSS = tuple(
+        CSSSelector(sel, translator="html") for sel in PRICE_SELECTORS + ("span",)
+    )
+    _SELLER_CSS = CSSSelector(SELLER_SELECTORS, translator="html")
+
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -132,9 +355,10 @@ class WortenScraper:
         self._driver = None
         self._driver_failed = False
         self._cloudflare_passed = False
-        self._session = requests.Session()
-        self._session.headers.update(self.HEADERS)
+        # Sessão HTTP compartilhada: reaproveita conexões TLS entre instâncias
+        self._session = _SHARED_SESSION
         self._chrome_version = get_chrome_version()
+        _OPEN_SCRAPERS.add(self)
 
     def _get_driver(self):
         """Obtém ou cria uma instância do WebDriver."""
@@ -161,6 +385,8 @@ class WortenScraper:
                     f"Usando undetected-chromedriver (Chrome v{self._chrome_version})"
                 )
 
+                self._block_heavy_resources()
+
                 # Inicializa sessão visitando a homepage pra passar o Cloudflare
                 if not self._cloudflare_passed:
                     self._pass_cloudflare()
@@ -186,6 +412,7 @@ class WortenScraper:
                 service = Service(ChromeDriverManager().install())
                 self._driver = webdriver.Chrome(service=service, options=options)
                 logger.info("Usando Selenium padrão")
+                self._block_heavy_resources()
 
                 # Inicializa a sessão
                 if not self._cloudflare_passed:
@@ -198,6 +425,16 @@ class WortenScraper:
         self._driver_failed = True
         return None
 
+    def _block_heavy_resources(self):
+        """Bloqueia imagens, fontes e analytics via CDP (não afetam a extração)."""
+        try:
+            self._driver.execute_cdp_cmd("Network.enable", {})
+            self._driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": self.BLOCKED_URLS}
+            )
+        except Exception as e:
+            logger.debug(f"Não foi possível bloquear recursos via CDP: {e}")
+
     def _pass_cloudflare(self):
         """Visita a homepage pra passar o desafio do Cloudflare."""
         if not self._driver:
@@ -208,16 +445,14 @@ class WortenScraper:
             self._driver.get(self.BASE_URL)
 
             # Aguarda o Cloudflare liberar (até 30 segundos)
-            for i in range(30):
-                title = self._driver.title.lower() if self._driver.title else ""
-                if "momento" not in title and "challenge" not in title:
-                    self._cloudflare_passed = True
-                    logger.info("Cloudflare liberado!")
-                    time.sleep(1)
-                    return
-                time.sleep(1)
-
-            logger.warning("Timeout no Cloudflare - pode não funcionar")
+            try:
+                WebDriverWait(self._driver, 30, poll_frequency=0.25).until(
+                    _cloudflare_cleared
+                )
+                self._cloudflare_passed = True
+                logger.info("Cloudflare liberado!")
+            except TimeoutException:
+                logger.warning("Timeout no Cloudflare - pode não funcionar")
         except Exception as e:
             logger.warning(f"Erro ao passar Cloudflare: {e}")
 
@@ -244,6 +479,13 @@ class WortenScraper:
             except Exception:
                 pass
 
+    def __del__(self):
+        # close() já é idempotente; aqui só garante que nada escapa no GC
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def search_product(self, query: str, ean: Optional[str] = None) -> ScrapedProduct:
         """
         Busca um produto na Worten.pt.
@@ -255,7 +497,66 @@ class WortenScraper:
         Returns:
             ScrapedProduct com os dados extraídos ou informação de erro
         """
-        # Monta os termos de busca em ordem de prioridade
+        search_terms = self._build_search_terms(query)
+
+        if not search_terms:
+            return ScrapedProduct(
+                is_available=False, error="Nenhum termo de busca informado"
+            )
+
+        # Usa Selenium (necessário pra passar o Cloudflare)
+        if self.use_selenium and not self._driver_failed:
+            for term in search_terms:
+                result = self._search_with_selenium(term)
+                if result.is_available or result.url:
+                    return result
+                # Bloqueado: não adianta tentar os outros termos agora
+                if result.rate_limited:
+                    return result
+                # Pequeno delay entre buscas
+                time.sleep(0.5)
+
+        # Sem navegador: os termos vão em paralelo pelo HTTP (sessão é thread-safe)
+        if not self.use_selenium or self._driver_failed:
+            result = self._search_terms_parallel(search_terms)
+            if result is not None:
+                return result
+
+        return ScrapedProduct(is_available=False, error=self.NOT_FOUND_ERROR)
+
+    def _search_terms_parallel(
+        self, search_terms: List[str]
+    ) -> Optional[ScrapedProduct]:
+        """
+        Busca todos os termos ao mesmo tempo via requests.
+
+        Os resultados são lidos na ordem de prioridade dos termos, como na
+        busca em série: um termo só ganha se os anteriores não acharam nada,
+        e os de menor prioridade ficam pra trás. Se nenhum achar, retorna o
+        resultado com rate_limited (se houver) pro delay adaptativo.
+        """
+        blocked = None
+        # Sem "with": o __exit__ esperaria as buscas de menor prioridade
+        executor = ThreadPoolExecutor(max_workers=len(search_terms))
+        try:
+            futures = [
+                executor.submit(self._search_with_requests, term)
+                for term in search_terms
+            ]
+            for future in futures:
+                result = future.result()
+                if result.is_available or result.url:
+                    return result
+                if result.rate_limited:
+                    blocked = result
+        finally:
+            # Não espera os termos de menor prioridade terminarem
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return blocked
+
+    def _build_search_terms(self, query: str) -> List[str]:
+        """Monta os termos de busca em ordem de prioridade."""
         search_terms = []
 
         if query:
@@ -263,25 +564,10 @@ class WortenScraper:
             search_terms.append(query)
 
             # 2. Fallback: palavras-chave principais (nome simplificado)
-            words = query.split()
-            skip_words = {
-                "de",
-                "da",
-                "do",
-                "das",
-                "dos",
-                "e",
-                "ou",
-                "com",
-                "para",
-                "em",
-                "um",
-                "uma",
-                "unidades",
-                "peças",
-            }
             significant = [
-                w for w in words if w.lower() not in skip_words and len(w) > 2
+                w
+                for w in query.split()
+                if len(w) > 2 and w.lower() not in _SKIP_WORDS
             ]
             # Nome simplificado como fallback
             if significant:
@@ -289,23 +575,29 @@ class WortenScraper:
                 if simplified != query:
                     search_terms.append(simplified)
 
-        if not search_terms:
-            return ScrapedProduct(
-                is_available=False, error="Nenhum termo de busca informado"
-            )
+        return search_terms
 
-        # Usa Selenium (necessário pra passar o Cloudflare)
+    async def search_async(
+        self, query: str, ean: Optional[str] = None
+    ) -> ScrapedProduct:
+        """
+        Versão assíncrona do search_product.
+
+        Tenta primeiro a busca via requests numa thread, sem abrir navegador.
+        Se não encontrar ou for bloqueado, cai pro Selenium (também numa
+        thread). Nenhum JS da resposta é executado no caminho HTTP.
+        """
+        # Sem Selenium o search_product já faz só o caminho HTTP
         if self.use_selenium and not self._driver_failed:
-            for term in search_terms:
-                result = self._search_with_selenium(term)
+            for term in self._build_search_terms(query):
+                result = await asyncio.to_thread(self._search_with_requests, term)
                 if result.is_available or result.url:
                     return result
-                # Pequeno delay entre buscas
-                time.sleep(0.5)
+                # Bloqueado: os outros termos também seriam
+                if result.rate_limited:
+                    break
 
-        return ScrapedProduct(
-            is_available=False, error="Produto não encontrado na Worten"
-        )
+        return await asyncio.to_thread(self.search_product, query, ean)
 
     def _search_with_selenium(self, search_term: str) -> ScrapedProduct:
         """Busca usando Selenium WebDriver."""
@@ -319,40 +611,37 @@ class WortenScraper:
 
             # Aguarda a página carregar
             if not self._wait_for_page_load(driver):
-                return ScrapedProduct(error="Timeout no Cloudflare")
+                return ScrapedProduct(error="Timeout no Cloudflare", rate_limited=True)
 
             # Aceita cookies se aparecer
             self._accept_cookies(driver)
 
-            # Espera os cards de produto carregarem (até 15 segundos)
-            for _ in range(15):
-                time.sleep(1)
-                try:
-                    # Scroll para forçar lazy loading
-                    driver.execute_script("window.scrollTo(0, 300)")
-                    # Verifica se tem product cards
-                    cards = driver.find_elements(
-                        By.CSS_SELECTOR, ".product-card, article.product-card"
-                    )
-                    if cards:
-                        logger.debug(f"Encontrados {len(cards)} product cards")
-                        break
-                except Exception:
-                    pass
+            # Espera os cards de produto carregarem (até 15 segundos).
+            # Só o elemento "stale" é ignorado: um navegador morto tem que
+            # cair no except WebDriverException lá embaixo
+            try:
+                cards = WebDriverWait(
+                    driver,
+                    15,
+                    poll_frequency=0.25,
+                    ignored_exceptions=(StaleElementReferenceException,),
+                ).until(self._find_cards_after_scroll)
+                logger.debug(f"Encontrados {len(cards)} product cards")
+            except TimeoutException:
+                pass
 
             # Verifica se redirecionou pra página do produto
             if "/p/" in driver.current_url:
                 return self._extract_product_page(driver, driver.current_url)
 
-            # Verifica se não encontrou resultados
-            page_source = driver.page_source.lower()
-            if "sem resultados" in page_source or "nenhum resultado" in page_source:
+            # Verifica se não encontrou resultados (no navegador, sem puxar o DOM)
+            if self._has_no_results(driver):
                 return ScrapedProduct(
                     is_available=False, error="Nenhum resultado encontrado"
                 )
 
             # Tenta extração via JSON primeiro (mais confiável)
-            result = self._extract_from_page_data(driver.page_source)
+            result = self._extract_from_driver_data(driver)
             if result and (result.is_available or result.url):
                 return result
 
@@ -372,79 +661,147 @@ class WortenScraper:
         """Busca usando requisições HTTP (pode ser bloqueado pelo Cloudflare)."""
         try:
             search_url = f"{self.SEARCH_URL}?query={quote_plus(search_term)}"
-            response = self._session.get(search_url, timeout=15)
-
-            if response.status_code == 403:
-                return ScrapedProduct(error="Bloqueado pelo Cloudflare (403)")
-
-            if response.status_code != 200:
-                return ScrapedProduct(error=f"HTTP {response.status_code}")
-
-            # Verifica se caiu na página do Cloudflare
-            if (
-                "challenge" in response.text.lower()
-                or "momento" in response.text.lower()[:500]
-            ):
-                return ScrapedProduct(error="Desafio Cloudflare detectado")
-
-            # Tenta extração JSON primeiro
-            result = self._extract_from_page_data(response.text)
-            if result and (result.is_available or result.url):
-                return result
+            # Lê no máximo MAX_RESPONSE_BYTES, mesmo que o servidor mande mais
+            with self._session.get(
+                search_url, headers=self.HEADERS, timeout=(5, 15), stream=True
+            ) as response:
+                raw = response.raw.read(self.MAX_RESPONSE_BYTES, decode_content=True)
+                html = raw.decode(response.encoding or "utf-8", errors="replace")
 
-            # Extração HTML
-            return self._extract_from_search_html(response.text)
+            return self._parse_search_response(response.status_code, html)
 
         except requests.Timeout:
             return ScrapedProduct(error="Timeout na requisição")
         except requests.RequestException as e:
             return ScrapedProduct(error=f"Erro na requisição: {str(e)[:100]}")
 
+    def _parse_search_response(self, status_code: int, html: str) -> ScrapedProduct:
+        """Interpreta a resposta HTTP de uma página de busca."""
+        if status_code == 403:
+            return ScrapedProduct(
+                error="Bloqueado pelo Cloudflare (403)", rate_limited=True
+            )
+
+        if status_code == 429:
+            return ScrapedProduct(
+                error="Limite de requisições atingido (429)", rate_limited=True
+            )
+
+        if status_code != 200:
+            return ScrapedProduct(error=f"HTTP {status_code}")
+
+        # Verifica se caiu na página do Cloudflare (só o começo do HTML)
+        head = html[:5000].lower()
+        if "challenge" in head or "momento" in head[:500]:
+            return ScrapedProduct(
+                error="Desafio Cloudflare detectado", rate_limited=True
+            )
+
+        # Tenta extração JSON primeiro
+        result = self._extract_from_page_data(html)
+        if result and (result.is_available or result.url):
+            return result
+
+        # Extração HTML
+        return self._extract_from_search_html(html)
+
     def _wait_for_page_load(self, driver, timeout: int = 10) -> bool:
         """Aguarda a página carregar (Cloudflare já deve ter passado)."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                title = driver.title.lower() if driver.title else ""
-                # Verifica se ainda tá no desafio do Cloudflare
-                if "momento" in title or "challenge" in title:
-                    time.sleep(1)
-                    continue
-                # Página carregou
-                return True
-            except Exception:
-                pass
-            time.sleep(0.5)
-        return False
+        # Sem ignored_exceptions: erro do WebDriver sobe pro chamador
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                _cloudflare_cleared
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def _find_cards_after_scroll(self, driver):
+        """Rola a página (força o lazy loading) e retorna os cards encontrados."""
+        driver.execute_script("window.scrollTo(0, 300)")
+        return driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_CARD_SELECTOR)
 
     def _accept_cookies(self, driver):
         """Aceita o popup de cookies se aparecer."""
         if not SELENIUM_AVAILABLE:
             return
         try:
-            for selector in ["#onetrust-accept-btn-handler", 'button[id*="accept"]']:
-                try:
-                    btn = WebDriverWait(driver, 2).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    btn.click()
-                    time.sleep(0.5)
-                    return
-                except Exception:
-                    continue
+            btn = WebDriverWait(driver, 1.5).until(
+                EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, self.COOKIE_BUTTON_SELECTOR)
+                )
+            )
+            btn.click()
         except Exception:
             pass
 
+    def _get_next_data_json(self, driver) -> Optional[str]:
+        """Lê só o conteúdo do script __NEXT_DATA__ direto no navegador."""
+        try:
+            return driver.execute_script(_NEXT_DATA_JS)
+        except Exception:
+            return None
+
+    def _has_no_results(self, driver) -> bool:
+        """Verifica o aviso de busca vazia no texto visível da página."""
+        try:
+            return bool(driver.execute_script(_NO_RESULTS_JS))
+        except Exception:
+            page_source = driver.page_source.lower()
+            return "sem resultados" in page_source or "nenhum resultado" in page_source
+
+    def _extract_from_driver_data(self, driver) -> Optional[ScrapedProduct]:
+        """
+        Extrai o JSON do Next.js sem serializar o DOM inteiro.
+
+        Só cai pro driver.page_source se a injeção de JS falhar.
+        """
+        json_text = self._get_next_data_json(driver)
+        if json_text is None:
+            return self._extract_from_page_data(driver.page_source)
+        return self._extract_from_next_data(json_text)
+
     def _extract_from_page_data(self, html: str) -> Optional[ScrapedProduct]:
         """Extrai dados do JSON embutido pelo Next.js na página."""
-        try:
-            match = re.search(
-                r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.DOTALL
-            )
-            if not match:
-                return None
+        # Busca por substring em vez de regex DOTALL sobre o HTML inteiro
+        start = html.find('<script id="__NEXT_DATA__"')
+        if start < 0:
+            return None
+        start = html.find(">", start) + 1
+        end = html.find("</script>", start)
+        if start <= 0 or end < 0:
+            return None
+
+        return self._extract_from_next_data(html[start:end])
+
+    def _extract_from_next_data(self, json_text: str) -> Optional[ScrapedProduct]:
+        """
+        Extrai o produto do JSON do __NEXT_DATA__, com cache por conteúdo.
+
+        A chave é um hash do JSON (não o texto, que pode ter centenas de KB)
+        e o cache guarda tuplas, então cada chamada recebe um objeto novo.
+        """
+        key = hashlib.blake2b(json_text.encode(), digest_size=16).digest()
+        with _NEXT_DATA_LOCK:
+            if key in _NEXT_DATA_CACHE:
+                _NEXT_DATA_CACHE.move_to_end(key)
+                fields = _NEXT_DATA_CACHE[key]
+                return ScrapedProduct(*fields) if fields else None
+
+        result = self._parse_next_data(json_text)
+        fields = astuple(result) if result else None
 
-            data = json.loads(match.group(1))
+        with _NEXT_DATA_LOCK:
+            _NEXT_DATA_CACHE[key] = fields
+            if len(_NEXT_DATA_CACHE) > _NEXT_DATA_CACHE_SIZE:
+                _NEXT_DATA_CACHE.popitem(last=False)
+
+        return result
+
+    def _parse_next_data(self, json_text: str) -> Optional[ScrapedProduct]:
+        """Percorre o JSON do __NEXT_DATA__ atrás do produto."""
+        try:
+            data = _json.loads(json_text)
             props = data.get("props", {}).get("pageProps", {})
 
             # Resultados de busca
@@ -529,7 +886,7 @@ class WortenScraper:
 
     def _extract_product_page(self, driver, url: str) -> ScrapedProduct:
         """Extrai dados da página de produto via DOM."""
-        result = self._extract_from_page_data(driver.page_source)
+        result = self._extract_from_driver_data(driver)
         if result and result.name:
             result.url = url
             return result
@@ -554,74 +911,36 @@ class WortenScraper:
 
     def _extract_from_search_dom(self, driver) -> ScrapedProduct:
         """Extrai dados dos resultados de busca via DOM."""
-        try:
-            # Importa By localmente se não estiver disponível globalmente
-            from selenium.webdriver.common.by import By as SeleniumBy
-            from selenium.webdriver.support.ui import WebDriverWait as SeleniumWait
-            from selenium.webdriver.support import expected_conditions as SeleniumEC
-        except ImportError:
+        if not SELENIUM_AVAILABLE:
             return ScrapedProduct(error="Selenium não disponível")
 
         try:
-            product = None
-            # Seletores atualizados para estrutura atual da Worten
-            for selector in [
-                "article.product-card",
-                ".product-card",
-                '[data-testid="product-card"]',
-                'article[itemtype*="Product"]',
-            ]:
-                try:
-                    product = SeleniumWait(driver, 5).until(
-                        SeleniumEC.presence_of_element_located(
-                            (SeleniumBy.CSS_SELECTOR, selector)
-                        )
+            # Uma única espera com todos os seletores de card combinados
+            try:
+                product = WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, self.PRODUCT_CARD_SELECTOR)
                     )
-                    if product:
-                        logger.info(f"Produto encontrado com seletor: {selector}")
-                        break
-                except Exception:
-                    continue
+                )
+            except Exception:
+                product = None
 
             if not product:
                 return ScrapedProduct(
                     is_available=False, error="Nenhum produto encontrado no DOM"
                 )
 
-            # Extrai URL - tenta link dentro do card
-            url = None
+            # Uma ida só ao navegador pra pegar todos os campos do card
             try:
-                link = product.find_element(
-                    SeleniumBy.CSS_SELECTOR, 'a[href*="/produtos/"]'
+                data = driver.execute_script(_EXTRACT_CARD_JS, product) or {}
+                url = data.get("url")
+                name = data.get("name")
+                price = self._parse_price(
+                    (data.get("price") or "").replace("\n", "").replace(" ", "")
                 )
-                url = link.get_attribute("href")
-            except Exception:
-                try:
-                    link = product.find_element(SeleniumBy.TAG_NAME, "a")
-                    href = link.get_attribute("href")
-                    if href and "/produtos/" in href:
-                        url = href
-                except Exception:
-                    pass
-
-            # Extrai nome - seletores atualizados
-            name = None
-            for sel in [
-                ".product-card__name-and-features",
-                "h3",
-                "h2",
-                '[class*="name"]',
-            ]:
-                try:
-                    elem = product.find_element(SeleniumBy.CSS_SELECTOR, sel)
-                    name = elem.text.strip()
-                    if name:
-                        break
-                except Exception:
-                    continue
-
-            price = self._extract_price_card(product)
-            seller = self._extract_seller_card(product)
+                seller = self._clean_seller_text(data.get("seller"))
+            except WebDriverException:
+                url, name, price, seller = self._extract_card_fields(product)
 
             return ScrapedProduct(
                 name=name,
@@ -634,37 +953,65 @@ class WortenScraper:
             logger.error(f"Erro na extração DOM: {e}")
             return ScrapedProduct(error=f"Erro na extração DOM: {str(e)[:100]}")
 
+    def _extract_card_fields(self, product):
+        """Extrai url, nome, preço e vendedor do card elemento por elemento."""
+        # Extrai URL - tenta link dentro do card
+        url = None
+        try:
+            link = product.find_element(By.CSS_SELECTOR, 'a[href*="/produtos/"]')
+            url = link.get_attribute("href")
+        except Exception:
+            try:
+                link = product.find_element(By.TAG_NAME, "a")
+                href = link.get_attribute("href")
+                if href and "/produtos/" in href:
+                    url = href
+            except Exception:
+                pass
+
+        # Extrai nome (pula elementos sem texto)
+        name = None
+        for sel in self.NAME_SELECTORS:
+            try:
+                elem = product.find_element(By.CSS_SELECTOR, sel)
+                name = elem.text.strip() or None
+                if name:
+                    break
+            except Exception:
+                continue
+
+        price = self._extract_price_card(product)
+        seller = self._extract_seller_card(product)
+        return url, name, price, seller
+
     def _extract_from_search_html(self, html: str) -> ScrapedProduct:
-        """Extrai dados dos resultados de busca via BeautifulSoup."""
+        """Extrai dados dos resultados de busca via lxml."""
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            root = lxml.html.fromstring(html, parser=_HTML_PARSER)
 
             product = None
-            for selector in [
-                '[data-testid="product-card"]',
-                ".product-card",
-                "article",
-            ]:
-                product = soup.select_one(selector)
-                if product:
+            for selector in self._HTML_CARD_CSS:
+                matches = selector(root)
+                if matches:
+                    product = matches[0]
                     break
 
-            if not product:
+            if product is None:
                 return ScrapedProduct(
                     is_available=False, error="Nenhum produto no HTML"
                 )
 
             url: Optional[str] = None
-            link = product.select_one('a[href*="/p/"]') or product.select_one("a")
-            if link and link.get("href"):
-                href = str(link["href"])
+            links = self._PRODUCT_LINK_CSS(product) or self._ANY_LINK_CSS(product)
+            if links and links[0].get("href"):
+                href = links[0].get("href")
                 url = href if href.startswith("http") else f"{self.BASE_URL}{href}"
 
             name = None
-            for selector in ["h3", "h2", '[class*="name"]']:
-                elem = product.select_one(selector)
-                if elem:
-                    name = elem.get_text(strip=True)
+            for selector in self._NAME_CSS:
+                matches = selector(product)
+                if matches:
+                    name = matches[0].text_content().strip() or None
                     if name:
                         break
 
@@ -695,30 +1042,23 @@ class WortenScraper:
 
     def _extract_price_card(self, card) -> Optional[Decimal]:
         """Extrai preço do card de produto."""
-        try:
-            from selenium.webdriver.common.by import By as SeleniumBy
-        except ImportError:
+        if not SELENIUM_AVAILABLE:
             return None
-        # Seletores atualizados para estrutura Worten
-        for selector in [
-            ".product-card__price",
-            '[class*="price"]',
-            '[class*="Price"]',
-        ]:
+        for selector in self.PRICE_SELECTORS:
             try:
-                elem = card.find_element(SeleniumBy.CSS_SELECTOR, selector)
+                elem = card.find_element(By.CSS_SELECTOR, selector)
                 price_text = elem.text.replace("\n", "").replace(" ", "")
                 return self._parse_price(price_text)
             except Exception:
                 continue
         return None
 
-    def _extract_price_html(self, soup_elem) -> Optional[Decimal]:
-        """Extrai preço do elemento BeautifulSoup."""
-        for selector in ['[class*="price"]', "span"]:
-            elem = soup_elem.select_one(selector)
-            if elem:
-                price = self._parse_price(elem.get_text())
+    def _extract_price_html(self, elem) -> Optional[Decimal]:
+        """Extrai preço do elemento lxml."""
+        for selector in self._PRICE_CSS:
+            matches = selector(elem)
+            if matches:
+                price = self._parse_price(matches[0].text_content())
                 if price:
                     return price
         return None
@@ -735,28 +1075,25 @@ class WortenScraper:
 
     def _extract_seller_card(self, card) -> str:
         """Extrai vendedor do card de produto."""
-        try:
-            from selenium.webdriver.common.by import By as SeleniumBy
-        except ImportError:
+        if not SELENIUM_AVAILABLE:
             return "Worten"
         try:
-            elem = card.find_element(
-                SeleniumBy.CSS_SELECTOR, '.product-card__seller, [class*="seller"]'
-            )
-            seller_text = elem.text.strip()
-            # Remove prefixos comuns
-            if seller_text.startswith("Vendido por "):
-                seller_text = seller_text.replace("Vendido por ", "")
-            return seller_text or "Worten"
+            elem = card.find_element(By.CSS_SELECTOR, self.SELLER_SELECTORS)
+            return self._clean_seller_text(elem.text)
         except Exception:
             return "Worten"
-            return "Worten"
 
-    def _extract_seller_html(self, soup_elem) -> str:
-        """Extrai vendedor do elemento HTML."""
-        elem = soup_elem.select_one('[class*="seller"]')
-        if elem:
-            return elem.get_text(strip=True) or "Worten"
+    def _clean_seller_text(self, text: Optional[str]) -> str:
+        """Normaliza o nome do vendedor vindo do card."""
+        # Remove prefixos comuns
+        seller_text = (text or "").strip().removeprefix("Vendido por ")
+        return seller_text or "Worten"
+
+    def _extract_seller_html(self, elem) -> str:
+        """Extrai vendedor do elemento lxml."""
+        matches = self._SELLER_CSS(elem)
+        if matches:
+            return matches[0].text_content().strip() or "Worten"
         return "Worten"
 
     def _parse_price(self, text: str) -> Optional[Decimal]:
@@ -764,13 +1101,18 @@ class WortenScraper:
         if not text:
             return None
 
-        cleaned = re.sub(r"[€EUR\s]", "", text)
+        # Caminho rápido pros preços "limpos" dos cards (ex: "1299,99€")
+        value = _parse_simple_price(text)
+        if value is not None:
+            return value
+
+        cleaned = _PRICE_STRIP_RE.sub("", text)
         if "," in cleaned and "." in cleaned:
             cleaned = cleaned.replace(".", "").replace(",", ".")
         elif "," in cleaned:
             cleaned = cleaned.replace(",", ".")
 
-        match = re.search(r"(\d+\.?\d*)", cleaned)
+        match = _PRICE_NUM_RE.search(cleaned)
         if match:
             try:
                 value = Decimal(match.group(1))
@@ -2,13 +2,42 @@
 Serviço de planilhas - leitura/escrita de dados de produtos.
 """
 
+import csv
 import logging
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from itertools import islice
 
+import numpy as np
 import pandas as pd
 from django.conf import settings
+from openpyxl import Workbook, load_workbook
+
+# Leitor de Excel em Rust, bem mais rápido que o openpyxl/xlrd na entrada
+try:
+    from python_calamine import CalamineWorkbook
+
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# xlsxwriter em constant_memory grava o xlsx em streaming mais rápido que o
+# write-only do openpyxl; sem ele o openpyxl continua fazendo a escrita
+try:
+    import xlsxwriter
+
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# Parquet (cópia interna sincronizada pela API) precisa do pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +58,54 @@ class SpreadsheetService:
         "Erro",
     ]
 
+    # Último DataFrame lido/gravado por arquivo:
+    # caminho -> ((mtime, tamanho), df, {ID: posição da linha}).
+    # Fica na classe porque as views criam um serviço novo a cada requisição.
+    _output_cache: Dict[
+        Path, Tuple[Tuple[int, int], pd.DataFrame, Dict[str, int]]
+    ] = {}
+
+    # Linhas lidas do banco e formatadas por vez na exportação
+    QUERYSET_CHUNK_SIZE = 2000
+
+    # Formato da coluna "Ultima Atualizacao"
+    TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    # Colunas com poucos valores distintos, dictionary-encoded no Parquet
+    DICTIONARY_COLUMNS = ("Vendedor", "Disponivel", "Erro")
+
+    # Colunas lidas sempre como texto na planilha de saída
+    TEXT_COLUMNS = {"ID": str, "EAN": str}
+
+    # Campos do Product usados pra montar a planilha de saída
+    QUERYSET_FIELDS = [
+        "original_id",
+        "ean",
+        "original_name",
+        "worten_name",
+        "worten_url",
+        "lowest_price",
+        "seller_name",
+        "is_available",
+        "last_scraped",
+        "scrape_error",
+    ]
+
     def __init__(
         self, input_path: Optional[Path] = None, output_path: Optional[Path] = None
     ):
         self.input_path = input_path or settings.INPUT_SPREADSHEET
         self.output_path = output_path or settings.OUTPUT_SPREADSHEET
+        if self.output_path.suffix.lower() == ".parquet" and not PYARROW_AVAILABLE:
+            # Sem pyarrow a cópia interna fica em CSV
+            self.output_path = self.output_path.with_suffix(".csv")
         self._ensure_output_directory()
 
+    @classmethod
+    def internal(cls) -> "SpreadsheetService":
+        """Serviço apontando pra cópia interna (Parquet), não pro XLSX."""
+        return cls(output_path=settings.INTERNAL_SPREADSHEET)
+
     def _ensure_output_directory(self):
         output_dir = self.output_path.parent
         if not output_dir.exists():
@@ -50,7 +120,9 @@ class SpreadsheetService:
 
         file_extension = self.input_path.suffix.lower()
 
-        if file_extension == ".xlsx":
+        if file_extension in (".xlsx", ".xls") and CALAMINE_AVAILABLE:
+            return pd.read_excel(self.input_path, engine="calamine")
+        elif file_extension == ".xlsx":
             return pd.read_excel(self.input_path, engine="openpyxl")
         elif file_extension == ".xls":
             return pd.read_excel(self.input_path, engine="xlrd")
@@ -59,23 +131,180 @@ class SpreadsheetService:
         else:
             raise ValueError(f"Formato de arquivo não suportado: {file_extension}")
 
+    def iter_input_rows(
+        self, columns: Iterable[str] = ("ID", "EAN", "Name"), batch_size: int = 1000
+    ) -> Iterator[List[Dict[str, str]]]:
+        """
+        Lê a planilha de entrada em lotes, sem carregar tudo na memória.
+
+        Cada lote é uma lista de dicts com as colunas pedidas já convertidas
+        pra texto (células vazias viram "").
+        """
+        if not self.input_path.exists():
+            raise FileNotFoundError(
+                f"Arquivo de entrada não encontrado: {self.input_path}"
+            )
+
+        columns = list(columns)
+        file_extension = self.input_path.suffix.lower()
+
+        if file_extension in (".xlsx", ".xls") and CALAMINE_AVAILABLE:
+            rows = self._iter_calamine_rows(columns)
+        elif file_extension == ".xlsx":
+            rows = self._iter_xlsx_rows(columns)
+        elif file_extension == ".csv":
+            rows = self._iter_csv_rows(columns, batch_size)
+        else:
+            # Sem leitor em streaming (ex: .xls): lê tudo de uma vez
+            df = self.read_input_spreadsheet()
+            rows = self._frame_to_records(df, columns)
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _iter_xlsx_rows(self, columns: List[str]) -> Iterator[Dict[str, str]]:
+        """Percorre o xlsx linha a linha com o openpyxl em modo read-only."""
+        wb = load_workbook(self.input_path, read_only=True, data_only=True)
+        try:
+            yield from self._rows_to_records(
+                wb.active.iter_rows(values_only=True), columns
+            )
+        finally:
+            wb.close()
+
+    def _iter_calamine_rows(self, columns: List[str]) -> Iterator[Dict[str, str]]:
+        """Percorre a primeira aba (xlsx ou xls) com o python-calamine."""
+        sheet = CalamineWorkbook.from_path(str(self.input_path)).get_sheet_by_index(0)
+        # O Excel guarda todo número como float: 123.0 volta a ser 123,
+        # senão IDs e EANs viram "123.0" (o openpyxl já faz isso sozinho)
+        rows = (
+            [
+                int(value) if isinstance(value, float) and value.is_integer() else value
+                for value in row
+            ]
+            for row in sheet.iter_rows()
+        )
+        yield from self._rows_to_records(rows, columns)
+
+    def _rows_to_records(
+        self, rows: Iterator[tuple], columns: List[str]
+    ) -> Iterator[Dict[str, str]]:
+        """Usa a primeira linha como cabeçalho e converte as demais em dicts."""
+        header = next(rows, None)
+        if header is None:
+            return
+
+        positions = {str(name): i for i, name in enumerate(header)}
+        for values in rows:
+            record = {}
+            for col in columns:
+                i = positions.get(col)
+                value = values[i] if i is not None and i < len(values) else None
+                # Célula vazia: None no openpyxl, "" no calamine
+                record[col] = "" if value is None else str(value)
+            yield record
+
+    def _iter_csv_rows(
+        self, columns: List[str], chunksize: int
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Lê o CSV em pedaços com o pandas.
+
+        Só as colunas pedidas, já como texto e com vazio = "" (sem NaN), então
+        cada pedaço sai pronto sem conversão por linha. O keep_default_na=False
+        também evita que nomes como "NA" ou "null" virem célula vazia.
+        """
+        wanted = set(columns)
+        reader = pd.read_csv(
+            self.input_path,
+            dtype=str,
+            usecols=lambda name: name in wanted,
+            keep_default_na=False,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            yield from self._frame_to_records(chunk, columns)
+
+    def _frame_to_records(
+        self, df: pd.DataFrame, columns: List[str]
+    ) -> List[Dict[str, str]]:
+        """Converte as colunas de uma vez; as que faltarem saem como ""."""
+        return (
+            df.reindex(columns=columns).fillna("").astype(str).to_dict("records")
+        )
+
     def read_output_spreadsheet(self) -> pd.DataFrame:
         """Lê a planilha de saída (ou retorna vazio se não existir)."""
+        return self._load_output()[0]
+
+    def _load_output(self) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Planilha de saída mais o índice ID -> posição da linha.
+
+        Reaproveita o último DataFrame lido/gravado enquanto o arquivo não
+        mudar (mesmo mtime e tamanho). Sempre devolve cópias, já que os
+        chamadores alteram os dois no lugar.
+        """
         if not self.output_path.exists():
-            return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
+            return pd.DataFrame(columns=self.OUTPUT_COLUMNS), {}
+
+        stamp = self._file_stamp()
+        cached = self._output_cache.get(self.output_path)
+        if cached is None or cached[0] != stamp:
+            df = self._read_output_file()
+            if df is None:
+                return pd.DataFrame(columns=self.OUTPUT_COLUMNS), {}
+
+            # Tudo como texto (object), menos o preço: colunas vazias vêm como
+            # float e as dictionary do Parquet como Categorical, e as duas
+            # recusariam os valores novos dos updates
+            df = df.astype({col: object for col in df.columns if col != "Menor Preco"})
+            cached = (stamp, df, self._build_id_index(df))
+            self._output_cache[self.output_path] = cached
+
+        return cached[1].copy(), dict(cached[2])
+
+    def _build_id_index(self, df: pd.DataFrame) -> Dict[str, int]:
+        if "ID" not in df:
+            return {}
+        return {str(product_id): i for i, product_id in enumerate(df["ID"].tolist())}
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        stat = self.output_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _remember_output(
+        self, df: pd.DataFrame, id_index: Optional[Dict[str, int]] = None
+    ):
+        """Guarda no cache o DataFrame que acabou de ser gravado."""
+        if id_index is None:
+            id_index = self._build_id_index(df)
+        self._output_cache[self.output_path] = (self._file_stamp(), df, id_index)
 
+    def _read_output_file(self) -> Optional[pd.DataFrame]:
         file_extension = self.output_path.suffix.lower()
 
         try:
+            # ID/EAN como texto, senão "123" vira 123 e não casa com o banco
             if file_extension == ".xlsx":
-                return pd.read_excel(self.output_path, engine="openpyxl")
+                return pd.read_excel(
+                    self.output_path, engine="openpyxl", dtype=self.TEXT_COLUMNS
+                )
             elif file_extension == ".csv":
-                return pd.read_csv(self.output_path)
+                return pd.read_csv(self.output_path, dtype=self.TEXT_COLUMNS)
+            elif file_extension == ".parquet":
+                return pd.read_parquet(self.output_path, engine="pyarrow")
             else:
-                return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
+                return None
         except Exception as e:
             logger.error(f"Erro ao ler arquivo de saída: {e}")
-            return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
+            return None
 
     def save_products(self, products: List[dict]) -> str:
         """Salva lista de produtos na planilha."""
@@ -83,47 +312,163 @@ class SpreadsheetService:
         return self._write_spreadsheet(df)
 
     def save_from_queryset(self, queryset) -> str:
-        """Salva produtos do queryset na planilha."""
-        products = []
-        for product in queryset:
-            products.append(
-                {
-                    "ID": product.original_id,
-                    "EAN": product.ean,
-                    "Nome Original": product.original_name,
-                    "Nome Worten": product.worten_name or "",
-                    "Link Worten": product.worten_url or "",
-                    "Menor Preco": (
-                        float(product.lowest_price) if product.lowest_price else ""
-                    ),
-                    "Vendedor": product.seller_name or "",
-                    "Disponivel": "Sim" if product.is_available else "Nao",
-                    "Ultima Atualizacao": (
-                        product.last_scraped.strftime("%Y-%m-%d %H:%M:%S")
-                        if product.last_scraped
-                        else ""
-                    ),
-                    "Erro": product.scrape_error or "",
-                }
-            )
+        """
+        Salva produtos do queryset na planilha.
+
+        Lê só as colunas necessárias via values_list(), sem instanciar os
+        modelos, e formata em pedaços de QUERYSET_CHUNK_SIZE linhas: no xlsx
+        e no CSV cada pedaço vai direto pro arquivo, então a memória não
+        cresce com o tamanho do catálogo.
+        """
+        values = queryset.values_list(*self.QUERYSET_FIELDS).iterator(
+            chunk_size=self.QUERYSET_CHUNK_SIZE
+        )
+        frames = self._iter_formatted_frames(values)
+        file_extension = self.output_path.suffix.lower()
 
-        df = pd.DataFrame(products, columns=self.OUTPUT_COLUMNS)
-        return self._write_spreadsheet(df)
+        if file_extension == ".parquet":
+            return self._write_spreadsheet(pd.concat(frames, ignore_index=True))
+        rows = (row for frame in frames for row in self._frame_rows(frame))
+        if file_extension == ".csv":
+            return self._stream_csv(rows)
+
+        return self._stream_xlsx(rows)
+
+    def _iter_formatted_frames(
+        self, values: Iterator[tuple]
+    ) -> Iterator[pd.DataFrame]:
+        """Agrupa as tuplas em pedaços e formata cada um por coluna."""
+        chunk = list(islice(values, self.QUERYSET_CHUNK_SIZE))
+        # Sempre gera ao menos um pedaço (vazio), pra sair o cabeçalho
+        yield self._format_frame(chunk)
+        while True:
+            chunk = list(islice(values, self.QUERYSET_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield self._format_frame(chunk)
+
+    def _format_frame(self, values: List[tuple]) -> pd.DataFrame:
+        """Converte as tuplas do values_list nas colunas da planilha."""
+        # Transpõe uma vez pra colunas (zip), em vez de o DataFrame montar
+        # a matriz de objetos linha a linha e separar as colunas depois
+        columns = list(zip(*values)) if values else [()] * len(self.QUERYSET_FIELDS)
+        df = pd.DataFrame(dict(zip(self.QUERYSET_FIELDS, columns)))
+
+        price = pd.to_numeric(df["lowest_price"], errors="coerce").astype(float)
+        last_scraped = pd.to_datetime(df["last_scraped"], utc=True)
+
+        return pd.DataFrame(
+            {
+                "ID": df["original_id"],
+                "EAN": df["ean"],
+                "Nome Original": df["original_name"],
+                "Nome Worten": df["worten_name"].fillna(""),
+                "Link Worten": df["worten_url"].fillna(""),
+                # Preço vazio/zero fica em branco
+                "Menor Preco": price.mask(price == 0),
+                "Vendedor": df["seller_name"].fillna(""),
+                "Disponivel": np.where(df["is_available"], "Sim", "Nao"),
+                "Ultima Atualizacao": last_scraped.dt.strftime(
+                    self.TIMESTAMP_FORMAT
+                ).fillna(""),
+                "Erro": df["scrape_error"].fillna(""),
+            },
+            columns=self.OUTPUT_COLUMNS,
+        )
+
+    def _frame_rows(self, df: pd.DataFrame) -> Iterator[tuple]:
+        """Linhas do DataFrame pro openpyxl, com NaN virando célula vazia."""
+        return (
+            df.astype(object)
+            .where(df.notna(), None)
+            .itertuples(index=False, name=None)
+        )
+
+    def _stream_csv(
+        self, rows: Iterable[tuple], columns: Optional[List[str]] = None
+    ) -> str:
+        """Escreve as linhas no CSV com o csv.writer, sem montar o texto todo."""
+        try:
+            with open(self.output_path, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns or self.OUTPUT_COLUMNS)
+                # None sai como campo vazio, igual ao na_rep="" do to_csv
+                writer.writerows(rows)
+            # Gravado em streaming: o próximo read_output_spreadsheet relê o arquivo
+            self._output_cache.pop(self.output_path, None)
+
+            logger.info(f"Planilha salva: {self.output_path}")
+            return str(self.output_path)
+
+        except Exception as e:
+            logger.error(f"Erro ao escrever planilha: {e}")
+            raise
 
-    def _write_spreadsheet(self, df: pd.DataFrame) -> str:
+    def _stream_xlsx(
+        self, rows: Iterable[tuple], columns: Optional[List[str]] = None
+    ) -> str:
+        """Escreve as linhas no xlsx em streaming (xlsxwriter ou openpyxl)."""
+        if self.output_path.suffix.lower() != ".xlsx":
+            # Se não reconhecer, salva como xlsx
+            self.output_path = self.output_path.with_suffix(".xlsx")
+
+        try:
+            if XLSXWRITER_AVAILABLE:
+                self._write_xlsxwriter(rows, columns or self.OUTPUT_COLUMNS)
+            else:
+                wb = Workbook(write_only=True)
+                ws = wb.create_sheet("Sheet1")
+                ws.append(columns or self.OUTPUT_COLUMNS)
+                for row in rows:
+                    ws.append(row)
+                wb.save(self.output_path)
+            self._output_cache.pop(self.output_path, None)
+
+            logger.info(f"Planilha salva: {self.output_path}")
+            return str(self.output_path)
+
+        except Exception as e:
+            logger.error(f"Erro ao escrever planilha: {e}")
+            raise
+
+    def _write_xlsxwriter(self, rows: Iterable[tuple], columns: List[str]):
+        """
+        Grava com o xlsxwriter em constant_memory (uma linha por vez no disco).
+
+        Textos ficam como texto: sem virar link nem fórmula, igual ao openpyxl.
+        """
+        wb = xlsxwriter.Workbook(
+            str(self.output_path),
+            {
+                "constant_memory": True,
+                "strings_to_urls": False,
+                "strings_to_formulas": False,
+            },
+        )
+        try:
+            ws = wb.add_worksheet("Sheet1")
+            ws.write_row(0, 0, columns)
+            for i, row in enumerate(rows, 1):
+                ws.write_row(i, 0, row)
+        finally:
+            wb.close()
+
+    def _write_spreadsheet(
+        self, df: pd.DataFrame, id_index: Optional[Dict[str, int]] = None
+    ) -> str:
         """Escreve o DataFrame no arquivo."""
         file_extension = self.output_path.suffix.lower()
+        if file_extension != ".parquet":
+            # Linha a linha nos writers de streaming, sem o to_excel/to_csv
+            stream = self._stream_csv if file_extension == ".csv" else self._stream_xlsx
+            path = stream(self._frame_rows(df), list(df.columns))
+            self._remember_output(df, id_index)
+            return path
 
         try:
-            if file_extension == ".xlsx":
-                df.to_excel(self.output_path, index=False, engine="openpyxl")
-            elif file_extension == ".csv":
-                df.to_csv(self.output_path, index=False, encoding="utf-8-sig")
-            else:
-                # Se não reconhecer, salva como xlsx
-                self.output_path = self.output_path.with_suffix(".xlsx")
-                df.to_excel(self.output_path, index=False, engine="openpyxl")
+            self._write_parquet(df)
 
+            self._remember_output(df, id_index)
             logger.info(f"Planilha salva: {self.output_path}")
             return str(self.output_path)
 
@@ -131,35 +476,144 @@ class SpreadsheetService:
             logger.error(f"Erro ao escrever planilha: {e}")
             raise
 
+    def _write_parquet(self, df: pd.DataFrame):
+        """
+        Grava em Parquet montando a tabela Arrow coluna a coluna.
+
+        O preço vira float64 (o "" dos preços vazios vira nulo), o resto
+        vira texto, e as colunas de poucos valores distintos vão com
+        dictionary encoding.
+        """
+        df = df.astype(object).where(df.notna(), None)
+        columns = {}
+        for col in df.columns:
+            if col == "Menor Preco":
+                price = pd.to_numeric(df[col], errors="coerce")
+                columns[col] = pa.array(price, type=pa.float64(), from_pandas=True)
+                continue
+
+            values = pa.array(df[col].fillna("").astype(str), type=pa.string())
+            if col in self.DICTIONARY_COLUMNS:
+                values = values.dictionary_encode()
+            columns[col] = values
+
+        pq.write_table(
+            pa.table(columns),
+            self.output_path,
+            compression="snappy",
+            use_dictionary=True,
+        )
+
     def add_product(self, product_data: dict) -> str:
         """Adiciona um produto na planilha."""
-        df = self.read_output_spreadsheet()
+        df, id_index = self._load_output()
+        df = self._append_rows(df, id_index, [product_data])
+        return self._write_spreadsheet(df, id_index)
 
-        row = {
+    def update_product(self, product_id: str, product_data: dict) -> str:
+        """Atualiza um produto na planilha (ou adiciona, se não existir)."""
+        df, id_index = self._load_output()
+        if not self._apply_update(df, id_index, product_id, product_data):
+            df = self._append_rows(df, id_index, [product_data])
+        return self._write_spreadsheet(df, id_index)
+
+    def update_products(self, products_data: List[dict]) -> str:
+        """
+        Atualiza vários produtos lendo e gravando o arquivo uma vez só.
+
+        Os que ainda não estão na planilha são adicionados no final.
+        """
+        if not products_data:
+            return str(self.output_path)
+
+        df, id_index = self._load_output()
+        missing = [
+            data
+            for data in products_data
+            if not self._apply_update(
+                df, id_index, data.get("original_id", ""), data
+            )
+        ]
+        if missing:
+            df = self._append_rows(df, id_index, missing)
+        return self._write_spreadsheet(df, id_index)
+
+    def delete_product(self, product_id: str) -> str:
+        """Remove um produto da planilha."""
+        df, id_index = self._load_output()
+        position = id_index.pop(product_id, None)
+        if position is None:
+            # Não está na planilha: nada a regravar
+            return str(self.output_path)
+
+        df = df.drop(df.index[position]).reset_index(drop=True)
+        # Só as linhas depois da removida mudam de posição
+        for i, other_id in enumerate(df["ID"].iloc[position:].tolist(), position):
+            id_index[str(other_id)] = i
+        return self._write_spreadsheet(df, id_index)
+
+    def _price_value(self, value) -> Optional[float]:
+        """Preço como float (Decimal na coluna float vira object no pandas)."""
+        return float(value) if value not in (None, "") else None
+
+    def _format_timestamp(self, value) -> str:
+        """Data da última coleta em UTC, no mesmo formato do _format_frame."""
+        if value is None:
+            return ""
+        return pd.to_datetime(value, utc=True).strftime(self.TIMESTAMP_FORMAT)
+
+    def _row_from_data(self, product_data: dict) -> dict:
+        """Monta a linha da planilha a partir dos campos do produto."""
+        return {
             "ID": product_data.get("original_id", ""),
             "EAN": product_data.get("ean", ""),
             "Nome Original": product_data.get("original_name", ""),
             "Nome Worten": product_data.get("worten_name", ""),
             "Link Worten": product_data.get("worten_url", ""),
-            "Menor Preco": product_data.get("lowest_price", ""),
+            "Menor Preco": self._price_value(product_data.get("lowest_price")),
             "Vendedor": product_data.get("seller_name", ""),
             "Disponivel": "Sim" if product_data.get("is_available") else "Nao",
-            "Ultima Atualizacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "Ultima Atualizacao": self._format_timestamp(
+                product_data.get("last_scraped")
+            ),
             "Erro": product_data.get("scrape_error", ""),
         }
 
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        return self._write_spreadsheet(df)
-
-    def update_product(self, product_id: str, product_data: dict) -> str:
-        """Atualiza um produto na planilha."""
-        df = self.read_output_spreadsheet()
-
-        mask = df["ID"] == product_id
-        if not mask.any():
-            return self.add_product(product_data)
-
+    def _append_rows(
+        self, df: pd.DataFrame, id_index: Dict[str, int], products_data: List[dict]
+    ) -> pd.DataFrame:
+        """Acrescenta as linhas no fim, sem o concat copiar a tabela toda."""
+        # Depois de um delete o índice tem buracos e o len(df) colidiria
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+
+        for data in products_data:
+            row = self._row_from_data(data)
+            position = len(df)
+            df.loc[position] = pd.Series(row)
+            id_index[str(row["ID"])] = position
+        return df
+
+    def _apply_update(
+        self,
+        df: pd.DataFrame,
+        id_index: Dict[str, int],
+        product_id: str,
+        product_data: dict,
+    ) -> bool:
+        """
+        Altera no lugar a linha do produto. Retorna False se não achar.
+
+        A linha vem do índice ID -> posição e as células são gravadas por
+        posição (iat), sem varrer a coluna de IDs.
+        """
+        position = id_index.get(product_id)
+        if position is None:
+            return False
+
+        columns = df.columns
         for col, key in [
+            ("ID", "original_id"),
             ("EAN", "ean"),
             ("Nome Original", "original_name"),
             ("Nome Worten", "worten_name"),
@@ -169,24 +623,27 @@ class SpreadsheetService:
             ("Erro", "scrape_error"),
         ]:
             if key in product_data:
-                df.loc[mask, col] = product_data[key]
+                value = product_data[key]
+                if key == "lowest_price":
+                    value = self._price_value(value)
+                df.iat[position, columns.get_loc(col)] = value
 
         if "is_available" in product_data:
-            df.loc[mask, "Disponivel"] = (
+            df.iat[position, columns.get_loc("Disponivel")] = (
                 "Sim" if product_data["is_available"] else "Nao"
             )
 
-        df.loc[mask, "Ultima Atualizacao"] = datetime.now().strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
-
-        return self._write_spreadsheet(df)
+        if "last_scraped" in product_data:
+            df.iat[position, columns.get_loc("Ultima Atualizacao")] = (
+                self._format_timestamp(product_data["last_scraped"])
+            )
 
-    def delete_product(self, product_id: str) -> str:
-        """Remove um produto da planilha."""
-        df = self.read_output_spreadsheet()
-        df = df[df["ID"] != product_id]
-        return self._write_spreadsheet(df)
+        # ID trocado: a posição passa a ser encontrada pelo novo
+        new_id = product_data.get("original_id")
+        if new_id is not None and str(new_id) != product_id:
+            del id_index[product_id]
+            id_index[str(new_id)] = position
+        return True
 
     def get_output_path(self) -> Path:
         """Retorna o caminho da planilha de saída."""
@@ -0,0 +1,86 @@
+"""
+Tarefas do Celery para a coleta de dados da Worten.
+Cada produto vira uma tarefa independente na fila de scraping.
+"""
+
+import logging
+
+from celery import shared_task
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Product
+from .services import WortenScraper, SpreadsheetService
+from .services.scraper import ScrapedProduct
+
+logger = logging.getLogger(__name__)
+
+# Um navegador por processo worker, reaproveitado entre as tarefas
+_scraper = None
+
+
+def _get_scraper() -> WortenScraper:
+    global _scraper
+    if _scraper is None:
+        _scraper = WortenScraper(headless=settings.SCRAPER_HEADLESS)
+    return _scraper
+
+
+@worker_process_shutdown.connect
+def _close_scraper(**kwargs):
+    """Fecha o navegador quando o processo worker encerra."""
+    if _scraper is not None:
+        _scraper.close()
+
+
+def _should_retry(result: ScrapedProduct) -> bool:
+    """Bloqueio do site ou erro temporário (não encontrado não conta)."""
+    if result.rate_limited:
+        return True
+    return bool(result.error) and result.error != WortenScraper.NOT_FOUND_ERROR
+
+
+@shared_task(bind=True, max_retries=3)
+def scrape_product(self, pk):
+    """
+    Coleta os dados de um produto na Worten e grava no banco.
+
+    O search_product não levanta exceção nas falhas de rede: elas voltam
+    no result.error. Esgotadas as tentativas o erro é gravado e a tarefa
+    termina normalmente, pra não derrubar o callback do chord.
+    """
+    product = Product.objects.only("id", "original_id", "original_name", "ean").get(
+        pk=pk
+    )
+
+    try:
+        result = _get_scraper().search_product(
+            query=product.original_name, ean=product.ean
+        )
+    except Exception as e:
+        result = ScrapedProduct(error=f"Erro na coleta: {str(e)[:100]}")
+
+    # Tenta de novo mais tarde em vez de gravar o erro
+    if _should_retry(result) and self.request.retries < self.max_retries:
+        raise self.retry(countdown=2 ** (self.request.retries + 1) * 5)
+
+    product.worten_name = result.name
+    product.worten_url = result.url
+    product.lowest_price = result.price
+    product.seller_name = result.seller
+    product.is_available = result.is_available
+    product.scrape_error = result.error
+    product.last_scraped = timezone.now()
+    product.save(update_fields=Product.SCRAPE_FIELDS + ["updated_at"])
+
+    logger.info(f"Produto {product.original_id} coletado")
+    return result.is_available
+
+
+@shared_task
+def export_spreadsheet():
+    """Regrava a planilha de saída (callback do chord de coleta)."""
+    # A cópia interna da API também, senão ela fica atrás do banco
+    SpreadsheetService.internal().save_from_queryset(Product.objects.all())
+    return SpreadsheetService().save_from_queryset(Product.objects.all())
@@ -0,0 +1,170 @@
+import re
+import time
+from decimal import Decimal
+from typing import Optional
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase
+
+from products.services.scraper import (
+    SELENIUM_AVAILABLE,
+    ScrapedProduct,
+    WortenScraper,
+    _parse_simple_price,
+)
+
+# Card com uma marca antes do título: a ordem no documento não é a de prioridade
+CARD_HTML = """
+<div data-testid="product-card">
+  <a href="/produtos/galaxy-s24-123"><span class="brand-name">Samsung</span></a>
+  <h3>Galaxy S24</h3>
+  <span class="price--old">999,99€</span>
+  <span class="product-card__price">899,99€</span>
+</div>
+"""
+
+
+class FakeElement:
+    """Elemento do Selenium com find_element resolvido por um dicionário."""
+
+    def __init__(self, text="", children=None):
+        self.text = text
+        self.children = children or {}
+
+    def find_element(self, by, selector):
+        if selector not in self.children:
+            raise Exception(f"no such element: {selector}")
+        return self.children[selector]
+
+
+class CardSelectorsTest(SimpleTestCase):
+    def setUp(self):
+        self.scraper = WortenScraper(use_selenium=False)
+
+    def test_html_name_follows_selector_priority(self):
+        result = self.scraper._extract_from_search_html(CARD_HTML)
+        self.assertEqual(result.name, "Galaxy S24")
+
+    def test_html_price_prefers_product_card_price(self):
+        result = self.scraper._extract_from_search_html(CARD_HTML)
+        self.assertEqual(result.price, Decimal("899.99"))
+
+    def test_html_name_skips_empty_match(self):
+        html = '<div class="product-card"><h3> </h3><h2>Galaxy S24</h2></div>'
+        result = self.scraper._extract_from_search_html(html)
+        self.assertEqual(result.name, "Galaxy S24")
+
+    @skipUnless(SELENIUM_AVAILABLE, "Selenium não instalado")
+    def test_card_fields_follow_selector_priority(self):
+        card = FakeElement(
+            children={
+                "h3": FakeElement("Galaxy S24"),
+                '[class*="name"]': FakeElement("Samsung"),
+                ".product-card__price": FakeElement("899,99€"),
+                '[class*="price"]': FakeElement("999,99€"),
+            }
+        )
+        _, name, price, _ = self.scraper._extract_card_fields(card)
+        self.assertEqual(name, "Galaxy S24")
+        self.assertEqual(price, Decimal("899.99"))
+
+
+def baseline_parse_price(text: str) -> Optional[Decimal]:
+    """_parse_price antes do caminho rápido, só com regex."""
+    if not text:
+        return None
+
+    cleaned = re.sub(r"[€EUR\s]", "", text)
+    if "," in cleaned and "." in cleaned:
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    elif "," in cleaned:
+        cleaned = cleaned.replace(",", ".")
+
+    match = re.search(r"(\d+\.?\d*)", cleaned)
+    if match:
+        try:
+            value = Decimal(match.group(1))
+            if value > 0:
+                return value
+        except Exception:
+            pass
+    return None
+
+
+class ParsePriceTest(SimpleTestCase):
+    PRICES = [
+        "1299,99€",
+        "1 299,99 €",
+        "1\u00a0299,99\u00a0€",
+        "1.299,99",
+        "1.299,99 €",
+        "899.99",
+        "0,00",
+        "12.",
+        "De 999,99€ por 899,99€",
+        "EUR 49,90",
+        "\u0661\u0662\u0663,\u0664\u0665",
+        "Preço: ٩٩,٩٠ €",
+        "grátis",
+        "",
+    ]
+
+    def setUp(self):
+        self.scraper = WortenScraper(use_selenium=False)
+
+    def test_simple_price(self):
+        self.assertEqual(_parse_simple_price("1299,99€"), Decimal("1299.99"))
+        self.assertEqual(_parse_simple_price("1 299,99 €"), Decimal("1299.99"))
+
+    def test_simple_price_leaves_thousands_separator_to_regex(self):
+        self.assertIsNone(_parse_simple_price("1.299,99"))
+        self.assertEqual(self.scraper._parse_price("1.299,99"), Decimal("1299.99"))
+
+    def test_simple_price_zero(self):
+        self.assertIsNone(_parse_simple_price("0,00"))
+        self.assertIsNone(self.scraper._parse_price("0,00"))
+
+    def test_simple_price_rejects_non_ascii_digits(self):
+        self.assertIsNone(_parse_simple_price("\u0661\u0662\u0663"))
+
+    def test_parse_price_matches_baseline(self):
+        for text in self.PRICES:
+            with self.subTest(text=text):
+                self.assertEqual(
+                    self.scraper._parse_price(text), baseline_parse_price(text)
+                )
+
+
+class SearchTermsParallelTest(SimpleTestCase):
+    def setUp(self):
+        self.scraper = WortenScraper(use_selenium=False)
+
+    def search_with(self, delays):
+        """Stub do _search_with_requests: cada termo acha após o seu delay."""
+
+        def search(term):
+            time.sleep(delays[term])
+            return ScrapedProduct(name=term, url=f"/produtos/{term}", price=1)
+
+        return mock.patch.object(self.scraper, "_search_with_requests", search)
+
+    def test_higher_priority_term_wins_even_if_slower(self):
+        with self.search_with({"ean": 0.3, "curto": 0.0}):
+            result = self.scraper._search_terms_parallel(["ean", "curto"])
+        self.assertEqual(result.name, "ean")
+
+    def test_does_not_wait_for_lower_priority_terms(self):
+        with self.search_with({"ean": 0.0, "curto": 2.0}):
+            start = time.monotonic()
+            result = self.scraper._search_terms_parallel(["ean", "curto"])
+            elapsed = time.monotonic() - start
+        self.assertEqual(result.name, "ean")
+        self.assertLess(elapsed, 1.0)
+
+    def test_returns_blocked_result_when_nothing_found(self):
+        blocked = ScrapedProduct(error="Bloqueado", rate_limited=True)
+        with mock.patch.object(
+            self.scraper, "_search_with_requests", return_value=blocked
+        ):
+            result = self.scraper._search_terms_parallel(["ean", "curto"])
+        self.assertTrue(result.rate_limited)
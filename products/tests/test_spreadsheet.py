@@ -0,0 +1,120 @@
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+
+from products.services import SpreadsheetService
+
+
+def product_data(original_id, **fields):
+    data = {
+        "original_id": original_id,
+        "ean": f"560{original_id}",
+        "original_name": f"Produto {original_id}",
+        "worten_name": None,
+        "worten_url": None,
+        "lowest_price": None,
+        "seller_name": None,
+        "is_available": False,
+        "last_scraped": None,
+        "scrape_error": None,
+    }
+    data.update(fields)
+    return data
+
+
+class SpreadsheetRowSyncTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.service = SpreadsheetService(output_path=Path(tmp.name) / "saida.csv")
+        for original_id in ("1", "2", "3"):
+            self.service.add_product(product_data(original_id))
+
+    def rows(self):
+        return self.service.read_output_spreadsheet()
+
+    def id_index(self):
+        return self.service._load_output()[1]
+
+    def test_add_builds_id_index(self):
+        self.assertEqual(self.rows()["ID"].tolist(), ["1", "2", "3"])
+        self.assertEqual(self.id_index(), {"1": 0, "2": 1, "3": 2})
+
+    def test_update_changes_row_in_place(self):
+        self.service.update_product(
+            "2", product_data("2", lowest_price=Decimal("19.90"), is_available=True)
+        )
+
+        row = self.rows().iloc[1]
+        self.assertEqual(row["ID"], "2")
+        self.assertEqual(row["Menor Preco"], 19.90)
+        self.assertEqual(row["Disponivel"], "Sim")
+        self.assertEqual(len(self.rows()), 3)
+
+    def test_update_with_new_id_moves_index_entry(self):
+        self.service.update_product("2", product_data("20"))
+
+        self.assertEqual(self.rows()["ID"].tolist(), ["1", "20", "3"])
+        self.assertEqual(self.id_index(), {"1": 0, "20": 1, "3": 2})
+
+    def test_update_unknown_id_appends(self):
+        self.service.update_product("4", product_data("4"))
+
+        self.assertEqual(self.rows()["ID"].tolist(), ["1", "2", "3", "4"])
+        self.assertEqual(self.id_index()["4"], 3)
+
+    def test_update_products_updates_and_appends(self):
+        self.service.update_products(
+            [product_data("1", seller_name="Worten"), product_data("4")]
+        )
+
+        self.assertEqual(self.rows()["ID"].tolist(), ["1", "2", "3", "4"])
+        self.assertEqual(self.rows().iloc[0]["Vendedor"], "Worten")
+
+    def test_delete_renumbers_following_rows(self):
+        self.service.delete_product("1")
+
+        self.assertEqual(self.rows()["ID"].tolist(), ["2", "3"])
+        self.assertEqual(self.id_index(), {"2": 0, "3": 1})
+
+    def test_delete_unknown_id_does_not_rewrite(self):
+        with mock.patch.object(self.service, "_write_spreadsheet") as write:
+            self.service.delete_product("99")
+        write.assert_not_called()
+
+    def test_update_products_empty_does_not_rewrite(self):
+        with mock.patch.object(self.service, "_write_spreadsheet") as write:
+            self.service.update_products([])
+        write.assert_not_called()
+
+    def test_last_scraped_written_in_utc(self):
+        local = datetime(2026, 1, 10, 18, 23, tzinfo=ZoneInfo("America/Sao_Paulo"))
+        self.service.update_product("1", product_data("1", last_scraped=local))
+        self.service.update_product(
+            "4",
+            product_data(
+                "4", last_scraped=datetime(2026, 1, 10, 21, 23, tzinfo=timezone.utc)
+            ),
+        )
+
+        rows = self.rows()
+        self.assertEqual(rows.iloc[0]["Ultima Atualizacao"], "2026-01-10 21:23:00")
+        self.assertEqual(rows.iloc[3]["Ultima Atualizacao"], "2026-01-10 21:23:00")
+
+    def test_last_scraped_matches_full_export(self):
+        scraped = datetime(2026, 1, 10, 18, 23, tzinfo=ZoneInfo("America/Sao_Paulo"))
+        data = product_data("1", last_scraped=scraped)
+        values = [tuple(data[field] for field in SpreadsheetService.QUERYSET_FIELDS)]
+
+        full = self.service._format_frame(values).iloc[0]["Ultima Atualizacao"]
+        self.assertEqual(self.service._row_from_data(data)["Ultima Atualizacao"], full)
+
+    def test_never_scraped_has_no_timestamp(self):
+        self.service.update_product("2", product_data("2", original_name="Novo nome"))
+
+        self.assertEqual(self.rows().iloc[1]["Ultima Atualizacao"], "")
@@ -0,0 +1,76 @@
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.test import TestCase
+
+from products.models import Product
+from products.services import WortenScraper
+from products.services.scraper import ScrapedProduct
+
+try:
+    from products import tasks
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+
+@skipUnless(CELERY_AVAILABLE, "Celery não instalado")
+class ScrapeProductTaskTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            original_id="123", ean="5600000000000", original_name="Galaxy S24"
+        )
+        self.scraper = mock.Mock()
+        patcher = mock.patch.object(tasks, "_get_scraper", return_value=self.scraper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_task(self):
+        # Eager: as retentativas rodam na hora, sem broker
+        tasks.scrape_product.apply(args=(self.product.pk,))
+        self.product.refresh_from_db()
+
+    def test_saves_found_product(self):
+        self.scraper.search_product.return_value = ScrapedProduct(
+            name="Galaxy S24",
+            url="https://www.worten.pt/produtos/galaxy-s24",
+            price=Decimal("899.99"),
+            seller="Worten",
+            is_available=True,
+        )
+        self.run_task()
+
+        self.assertEqual(self.scraper.search_product.call_count, 1)
+        self.assertEqual(self.product.lowest_price, Decimal("899.99"))
+        self.assertTrue(self.product.is_available)
+        self.assertIsNotNone(self.product.last_scraped)
+
+    def test_not_found_is_not_retried(self):
+        self.scraper.search_product.return_value = ScrapedProduct(
+            error=WortenScraper.NOT_FOUND_ERROR
+        )
+        self.run_task()
+
+        self.assertEqual(self.scraper.search_product.call_count, 1)
+        self.assertEqual(self.product.scrape_error, WortenScraper.NOT_FOUND_ERROR)
+
+    def test_rate_limited_is_retried_then_saved(self):
+        self.scraper.search_product.return_value = ScrapedProduct(
+            error="Limite de requisições atingido (429)", rate_limited=True
+        )
+        self.run_task()
+
+        max_retries = tasks.scrape_product.max_retries
+        self.assertEqual(self.scraper.search_product.call_count, max_retries + 1)
+        self.assertEqual(
+            self.product.scrape_error, "Limite de requisições atingido (429)"
+        )
+
+    def test_scraper_exception_is_saved_after_retries(self):
+        self.scraper.search_product.side_effect = RuntimeError("driver morto")
+        self.run_task()
+
+        max_retries = tasks.scrape_product.max_retries
+        self.assertEqual(self.scraper.search_product.call_count, max_retries + 1)
+        self.assertIn("driver morto", self.product.scrape_error)
@@ -3,9 +3,18 @@ Views da API de produtos.
 Inclui operações CRUD, download de arquivo e endpoints de scraping.
 """
 
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max
 from django.utils import timezone
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -19,10 +28,101 @@ from .serializers import (
     ProductUpdateSerializer,
     ProductListSerializer,
 )
-from .services import WortenScraper, SpreadsheetService
+from .services import (
+    IMPORT_BATCH_SIZE,
+    SpreadsheetService,
+    WortenScraper,
+    import_rows,
+)
 
 logger = logging.getLogger(__name__)
 
+# A cópia interna da planilha é gravada numa única thread em background,
+# depois do commit: a resposta não espera o arquivo e as gravações não
+# concorrem entre si (cada uma lê, altera e regrava o arquivo)
+_spreadsheet_writer = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="spreadsheet"
+)
+_full_sync_lock = threading.Lock()
+_full_sync_pending = False
+
+
+# Chave do cache com (versão dos dados, mtime do arquivo) da última geração
+DOWNLOAD_CACHE_KEY = "products:download:built"
+
+
+def _products_version():
+    """
+    Retorna (versão, quantidade) dos produtos no banco.
+
+    A versão junta a quantidade e o maior updated_at: criar ou alterar muda
+    o updated_at, excluir muda a quantidade. Vale também pra mudanças feitas
+    pelo comando ou pelo Celery, sem depender de flags entre processos.
+    """
+    stats = Product.objects.aggregate(count=Count("id"), last=Max("updated_at"))
+    last = stats["last"].isoformat() if stats["last"] else ""
+    version = hashlib.md5(f"{stats['count']}|{last}".encode()).hexdigest()
+    return version, stats["count"]
+
+
+def _file_mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _queue_full_sync():
+    """Enfileira uma regravação completa, se já não houver uma na fila."""
+    global _full_sync_pending
+    with _full_sync_lock:
+        if _full_sync_pending:
+            return
+        _full_sync_pending = True
+    _spreadsheet_writer.submit(_write_full)
+
+
+def _write_full():
+    global _full_sync_pending
+    # Liberada antes de ler o banco: mudanças feitas durante a leitura
+    # enfileiram uma nova regravação em vez de se perderem
+    with _full_sync_lock:
+        _full_sync_pending = False
+
+    close_old_connections()
+    try:
+        SpreadsheetService.internal().save_from_queryset(Product.objects.all())
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar planilha: {e}")
+    finally:
+        close_old_connections()
+
+
+def _write_products(products_data, original_id=None):
+    close_old_connections()
+    try:
+        service = SpreadsheetService.internal()
+        if not service.output_exists():
+            # Sem arquivo ainda: gera ele inteiro a partir do banco
+            service.save_from_queryset(Product.objects.all())
+        elif original_id is not None:
+            service.update_product(original_id, products_data[0])
+        else:
+            service.update_products(products_data)
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar planilha: {e}")
+    finally:
+        close_old_connections()
+
+
+def _write_deleted(original_id):
+    try:
+        service = SpreadsheetService.internal()
+        if service.output_exists():
+            service.delete_product(original_id)
+    except Exception as e:
+        logger.error(f"Erro ao sincronizar planilha: {e}")
+
 
 class ProductViewSet(viewsets.ModelViewSet):
     """
@@ -46,12 +146,50 @@ class ProductViewSet(viewsets.ModelViewSet):
         return ProductSerializer
 
     def _sync_spreadsheet(self):
-        """Sincroniza o banco com o arquivo da planilha."""
-        try:
-            service = SpreadsheetService()
-            service.save_from_queryset(Product.objects.all())
-        except Exception as e:
-            logger.error(f"Erro ao sincronizar planilha: {e}")
+        """Agenda a regravação da cópia interna inteira a partir do banco."""
+        transaction.on_commit(_queue_full_sync)
+
+    def _product_data(self, product):
+        """Campos do produto no formato que o SpreadsheetService espera."""
+        return {
+            field: getattr(product, field)
+            for field in SpreadsheetService.QUERYSET_FIELDS
+        }
+
+    def _sync_products(self, products, original_id=None):
+        """
+        Agenda a atualização só das linhas dos produtos alterados.
+
+        original_id é o ID antigo, quando um único produto teve o ID trocado.
+        Os dados são copiados agora; o arquivo é gravado depois do commit.
+        """
+        products_data = [self._product_data(p) for p in products]
+        transaction.on_commit(
+            lambda: _spreadsheet_writer.submit(
+                _write_products, products_data, original_id
+            )
+        )
+
+    def _sync_deleted(self, original_id):
+        """Agenda a remoção da linha do produto excluído."""
+        transaction.on_commit(
+            lambda: _spreadsheet_writer.submit(_write_deleted, original_id)
+        )
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self._sync_products([serializer.instance])
+
+    def perform_update(self, serializer):
+        # Guarda o ID antigo: a linha da planilha é localizada por ele
+        original_id = serializer.instance.original_id
+        super().perform_update(serializer)
+        self._sync_products([serializer.instance], original_id=original_id)
+
+    def perform_destroy(self, instance):
+        original_id = instance.original_id
+        super().perform_destroy(instance)
+        self._sync_deleted(original_id)
 
     @swagger_auto_schema(
         operation_description="Lista todos os produtos com paginação",
@@ -76,10 +214,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def create(self, request, *args, **kwargs):
         """Cria um produto e sincroniza com a planilha."""
-        response = super().create(request, *args, **kwargs)
-        if response.status_code == status.HTTP_201_CREATED:
-            self._sync_spreadsheet()
-        return response
+        return super().create(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Atualiza um produto completamente",
@@ -88,10 +223,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def update(self, request, *args, **kwargs):
         """Atualiza um produto e sincroniza com a planilha."""
-        response = super().update(request, *args, **kwargs)
-        if response.status_code == status.HTTP_200_OK:
-            self._sync_spreadsheet()
-        return response
+        return super().update(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Atualiza parcialmente um produto",
@@ -100,10 +232,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def partial_update(self, request, *args, **kwargs):
         """Atualiza parcialmente um produto e sincroniza com a planilha."""
-        response = super().partial_update(request, *args, **kwargs)
-        if response.status_code == status.HTTP_200_OK:
-            self._sync_spreadsheet()
-        return response
+        return super().partial_update(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Remove um produto",
@@ -111,10 +240,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         """Remove um produto e sincroniza com a planilha."""
-        response = super().destroy(request, *args, **kwargs)
-        if response.status_code == status.HTTP_204_NO_CONTENT:
-            self._sync_spreadsheet()
-        return response
+        return super().destroy(request, *args, **kwargs)
 
     @swagger_auto_schema(
         method="get",
@@ -124,6 +250,7 @@ class ProductViewSet(viewsets.ModelViewSet):
                 description="Download do arquivo Excel",
                 schema=openapi.Schema(type=openapi.TYPE_FILE),
             ),
+            304: "Planilha não mudou desde o último download (If-None-Match)",
             404: "Arquivo não encontrado",
         },
     )
@@ -135,12 +262,25 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         try:
             service = SpreadsheetService()
+            file_path = service.get_output_path()
 
-            # Garante que a planilha está atualizada
-            if Product.objects.exists():
+            # Versão dos dados: muda a cada criação, alteração ou exclusão
+            version, count = _products_version()
+            etag = quote_etag(version)
+
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                # O 304 leva o mesmo validador que o 200 mandaria
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            # Só regera o XLSX se o banco mudou desde a última geração
+            # (ou se o arquivo sumiu ou foi regravado por outro processo)
+            built = cache.get(DOWNLOAD_CACHE_KEY)
+            current = (version, _file_mtime(file_path))
+            if count and built != current:
                 service.save_from_queryset(Product.objects.all())
-
-            file_path = service.get_output_path()
+                cache.set(DOWNLOAD_CACHE_KEY, (version, _file_mtime(file_path)), None)
 
             if not file_path.exists():
                 return Response(
@@ -155,6 +295,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             response["Content-Disposition"] = (
                 'attachment; filename="produtos_worten.xlsx"'
             )
+            response["ETag"] = etag
             return response
 
         except Exception as e:
@@ -191,32 +332,19 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         try:
             service = SpreadsheetService()
-            df = service.read_input_spreadsheet()
 
             imported = 0
             skipped = 0
 
-            for _, row in df.iterrows():
-                product_id = str(row.get("ID", ""))
-                if not product_id:
-                    skipped += 1
-                    continue
-
-                product, created = Product.objects.update_or_create(
-                    original_id=product_id,
-                    defaults={
-                        "ean": str(row.get("EAN", "")),
-                        "original_name": str(row.get("Name", "")),
-                    },
-                )
-
-                if created:
-                    imported += 1
-                else:
-                    skipped += 1
+            # Lotes gravados com bulk_create, sem um update_or_create por linha
+            for rows in service.iter_input_rows(batch_size=IMPORT_BATCH_SIZE):
+                created, _ = import_rows(rows)
+                imported += created
+                # Sem ID, repetidos ou já existentes contam como pulados
+                skipped += len(rows) - created
 
-            # Salva na planilha de saída
-            service.save_from_queryset(Product.objects.all())
+            # Atualiza a cópia interna em background (o XLSX é gerado no download)
+            self._sync_spreadsheet()
 
             return Response(
                 {
@@ -279,10 +407,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Pega product_ids do body, se existir
         product_ids = request.data.get("product_ids", []) if request.data else []
 
+        # Só as colunas usadas na busca e na sincronização com a planilha
+        products = Product.objects.only("id", *SpreadsheetService.QUERYSET_FIELDS)
         if product_ids:
-            products = Product.objects.filter(original_id__in=product_ids)
-        else:
-            products = Product.objects.all()
+            products = products.filter(original_id__in=product_ids)
 
         if not products.exists():
             return Response(
@@ -290,45 +418,93 @@ class ProductViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        scraper = WortenScraper()
+        # Cada thread usa o seu scraper: o WebDriver não é thread-safe
+        local = threading.local()
+        scrapers = []
+
+        def search(product):
+            scraper = getattr(local, "scraper", None)
+            if scraper is None:
+                scraper = local.scraper = WortenScraper()
+                scrapers.append(scraper)
+            return scraper.search_product(
+                query=product.original_name, ean=product.ean
+            )
+
+        scraped_products = []
+        failed_products = []
         scraped = 0
         found = 0
         not_found = 0
         errors = 0
 
-        for product in products:
-            try:
-                result = scraper.search_product(
-                    query=product.original_name, ean=product.ean
-                )
+        # As buscas rodam em paralelo; o banco só é acessado nesta thread
+        try:
+            with ThreadPoolExecutor(max_workers=settings.SCRAPE_MAX_WORKERS) as pool:
+                futures = {
+                    pool.submit(search, product): product for product in products
+                }
 
-                product.worten_name = result.name
-                product.worten_url = result.url
-                product.lowest_price = result.price
-                product.seller_name = result.seller
-                product.is_available = result.is_available
-                product.scrape_error = result.error
-                product.last_scraped = timezone.now()
-                product.save()
-
-                scraped += 1
-
-                if result.is_available:
-                    found += 1
-                elif result.error:
-                    errors += 1
-                else:
-                    not_found += 1
-
-            except Exception as e:
-                logger.error(f"Erro ao coletar produto {product.original_id}: {e}")
-                product.scrape_error = str(e)
-                product.last_scraped = timezone.now()
-                product.save()
-                errors += 1
-
-        # Sincroniza com a planilha
-        self._sync_spreadsheet()
+                for future in as_completed(futures):
+                    product = futures[future]
+                    product.last_scraped = timezone.now()
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(
+                            f"Erro ao coletar produto {product.original_id}: {e}"
+                        )
+                        product.scrape_error = str(e)
+                        failed_products.append(product)
+                        errors += 1
+                        continue
+
+                    scraped_products.append(product)
+
+                    product.worten_name = result.name
+                    product.worten_url = result.url
+                    product.lowest_price = result.price
+                    product.seller_name = result.seller
+                    product.is_available = result.is_available
+                    product.scrape_error = result.error
+
+                    scraped += 1
+
+                    if result.is_available:
+                        found += 1
+                    elif result.error:
+                        errors += 1
+                    else:
+                        not_found += 1
+        finally:
+            for scraper in scrapers:
+                scraper.close()
+
+        # Uma gravação em lote no fim, em vez de um save() por produto.
+        # bulk_update não dispara o auto_now, então o updated_at vai junto
+        now = timezone.now()
+        for product in scraped_products + failed_products:
+            product.updated_at = now
+
+        with transaction.atomic():
+            Product.objects.bulk_update(
+                scraped_products,
+                Product.SCRAPE_FIELDS + ["updated_at"],
+                batch_size=500,
+            )
+            # Nas exceções só o erro e a data mudam, o resto fica como estava
+            Product.objects.bulk_update(
+                failed_products,
+                ["scrape_error", "last_scraped", "updated_at"],
+                batch_size=500,
+            )
+
+        # Sincroniza com a planilha: com IDs, só as linhas coletadas
+        if product_ids:
+            self._sync_products(scraped_products + failed_products)
+        else:
+            self._sync_spreadsheet()
 
         return Response(
             {
@@ -369,8 +545,8 @@ class ProductViewSet(viewsets.ModelViewSet):
             product.last_scraped = timezone.now()
             product.save()
 
-            # Sincroniza com a planilha
-            self._sync_spreadsheet()
+            # Sincroniza com a planilha (só a linha do produto)
+            self._sync_products([product])
 
             return Response(ProductSerializer(product).data)
 